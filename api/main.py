@@ -1,24 +1,27 @@
 # main.py
 
 from fastapi import FastAPI
+from fastapi import HTTPException
 from pydantic import BaseModel
 import sys
 import os
 
 sys.path.append("..")
 
-import pandas as pd
+import config
 
 # create app
 app = FastAPI(title="Aksum Credit Risk API")
 
 # global models
 credit_model = None
+model_registry = None
+response_surfaces = None
 fraud_model = None
 shap_explainer = None
 case_retrieval = None
 llm_agent = None
-customer_data = None
+shap_store = None
 
 
 class CustomerInput(BaseModel):
@@ -42,8 +45,8 @@ class CustomerInput(BaseModel):
 @app.on_event("startup")
 async def startup():
     
-    global credit_model, fraud_model, shap_explainer
-    global case_retrieval, llm_agent, customer_data
+    global credit_model, model_registry, response_surfaces, fraud_model, shap_explainer
+    global case_retrieval, llm_agent, shap_store
     
     print("Loading models...")
     
@@ -51,38 +54,65 @@ async def startup():
     sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
     
     from models.xgboost_model import AksumCreditModel
+    from models.model_registry import AksumModelRegistry
+    from models.response_surface import load_surfaces
     from models.fraud_detector import AksumFraudDetector
-    from explainability.shap_explainer import AksumExplainer
     from vector_store.case_retrieval import AksumCaseRetrieval
     from llm_agent.risk_reasoning import AksumLLMAgent
     import config
     
     # load credit model
+    model_path = "saved_models/aksum_credit_model.pkl"
     credit_model = AksumCreditModel()
-    credit_model.load_model("saved_models/aksum_credit_model.pkl")
+    credit_model.load_model(model_path)
+    
+    # champion plus shadow challengers
+    model_registry = AksumModelRegistry()
+    model_registry.register("champion", credit_model, champion=True)
+    for name, path in config.CHALLENGER_MODELS.items():
+        model_registry.load_model(name, path)
+    
+    # slider grids, rebuilt if model changed
+    response_surfaces = load_surfaces(credit_model)
     
     # load fraud detector
     fraud_model = AksumFraudDetector()
     fraud_model.load_detector("saved_models")
+    if config.FRAUD_ONLINE_ENABLED:
+        fraud_model.enable_online_detector()
     
-    # load data
-    customer_data = pd.read_csv("data/customer_data.csv")
-    X = customer_data[config.FEATURE_NAMES]
-    
-    # setup explainer
-    shap_explainer = AksumExplainer(credit_model.model)
-    shap_explainer.setup_explainer(X)
+    # setup explainer, shap is only imported for the shap backend
+    # tree explainer itself is built on the first request
+    # contribs explanations come from the model registry
+    if config.EXPLAINER_BACKEND == "shap":
+        from explainability.shap_explainer import AksumExplainer
+        shap_explainer = AksumExplainer(credit_model.model, credit_model.get_background_path(model_path))
     
     # setup retrieval
     case_retrieval = AksumCaseRetrieval()
     case_retrieval.load_index("vector_data")
     
+    # portfolio shap values, built offline by jobs/build_shap_store.py
+    from explainability.shap_store import AksumShapStore
+    store = AksumShapStore()
+    if store.exists():
+        store.load()
+        shap_store = store
+    
     # setup llm
     llm_agent = AksumLLMAgent()
     
     print("All models loaded!")
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    
+    # write out pending shadow scores
+    if model_registry is not None:
+        model_registry.flush()
+
+
 @app.get("/")
 async def root():
     return {"message": "Aksum Credit Risk API"}
@@ -95,7 +125,7 @@ async def health():
         "models_loaded": {
             "xgboost": credit_model is not None,
             "fraud_detector": fraud_model is not None,
-            "explainer": shap_explainer is not None,
+            "explainer": shap_explainer is not None or config.EXPLAINER_BACKEND == "contribs",
             "retrieval": case_retrieval is not None,
             "llm_agent": llm_agent is not None
         }
@@ -103,7 +133,7 @@ async def health():
 
 
 @app.post("/predict")
-async def predict(customer: CustomerInput, mode: str = "strict"):
+async def predict(customer: CustomerInput, mode: str = "strict", tier: str = "full"):
     
     # convert to dict
     data = {
@@ -124,14 +154,54 @@ async def predict(customer: CustomerInput, mode: str = "strict"):
         "late_payment_rate": customer.late_payment_rate
     }
     
+    # check tier
+    if tier not in config.PREDICTION_TIERS:
+        raise HTTPException(status_code=400, detail="Unknown tier: " + tier)
+    
     # get prediction
-    result = credit_model.predict_single(data)
+    result = model_registry.predict_single(data, tier=tier)
     
     # update category with mode
     cat = credit_model.get_risk_category(result["default_probability"], mode)
     result["risk_category"] = cat
     
-    return {"prediction": result, "mode": mode}
+    return {"prediction": result, "mode": mode, "tier": tier}
+
+
+@app.get("/quick_check")
+async def quick_check(
+    delay: float,
+    utilization: float,
+    late_rate: float,
+    dispute_rate: float,
+    order_frequency: float = None,
+    mode: str = "strict"
+):
+    
+    sliders = {
+        "delay": delay,
+        "utilization": utilization,
+        "late_rate": late_rate,
+        "dispute_rate": dispute_rate,
+    }
+    
+    # order frequency is only on the risk calculator grid
+    if order_frequency is None:
+        surface = response_surfaces["quick_check"]
+    else:
+        sliders["order_frequency"] = order_frequency
+        surface = response_surfaces["risk_calculator"]
+    
+    prob = surface.lookup(sliders)
+    cat = credit_model.get_risk_category(prob, mode)
+    
+    return {
+        "default_probability": round(prob, 4),
+        "risk_category": cat,
+        "surface": surface.name,
+        "model_version": surface.model_version,
+        "mode": mode
+    }
 
 
 @app.post("/fraud_check")
@@ -181,11 +251,13 @@ async def explain(customer: CustomerInput):
         "late_payment_rate": customer.late_payment_rate
     }
     
-    # prediction
-    pred = credit_model.predict_single(data)
-    
-    # explanation
-    exp = shap_explainer.explain_single(data)
+    # prediction and explanation
+    # through the registry so challengers shadow these requests too
+    if config.EXPLAINER_BACKEND == "shap":
+        pred = model_registry.predict_single(data)
+        exp = shap_explainer.explain_single(data, approximate=config.EXPLAIN_APPROXIMATE["explain"])
+    else:
+        pred, exp = model_registry.predict_and_explain(data, approximate=config.EXPLAIN_APPROXIMATE["explain"])
     
     return {
         "prediction": pred,
@@ -267,12 +339,56 @@ async def stats():
     
     llm_stats = llm_agent.get_api_stats()
     
+    # contribs explanations are cached by the registry that serves them
+    if config.EXPLAINER_BACKEND == "shap":
+        explain_cache = shap_explainer.cache
+    else:
+        explain_cache = model_registry.explain_cache
+    
     return {
         "llm_stats": llm_stats,
-        "data_samples": len(customer_data) if customer_data is not None else 0
+        "explain_cache": explain_cache.get_stats(),
+        "data_samples": len(case_retrieval.customer_data) if case_retrieval is not None else 0
     }
 
 
+@app.get("/portfolio_drivers")
+async def portfolio_drivers():
+    
+    if shap_store is None:
+        raise HTTPException(status_code=404, detail="SHAP store not built")
+    
+    return {
+        "model_version": shap_store.manifest["model_version"],
+        "num_customers": shap_store.manifest["num_customers"],
+        "drivers": shap_store.global_importance()
+    }
+
+
+@app.get("/portfolio_drivers/segments")
+async def segment_drivers():
+    
+    if shap_store is None or shap_store.segments is None:
+        raise HTTPException(status_code=404, detail="No segment data in SHAP store")
+    
+    summary = shap_store.segment_summary()
+    
+    return {"segments": summary.to_dict(orient="index")}
+
+
+@app.get("/portfolio_drivers/{customer_id}")
+async def customer_drivers(customer_id: str):
+    
+    if shap_store is None:
+        raise HTTPException(status_code=404, detail="SHAP store not built")
+    
+    result = shap_store.lookup(customer_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Unknown customer: " + customer_id)
+    
+    return result
+
+
 @app.post("/full_analysis")
 async def full_analysis(customer: CustomerInput):
     
@@ -294,15 +410,16 @@ async def full_analysis(customer: CustomerInput):
         "late_payment_rate": customer.late_payment_rate
     }
     
-    # prediction
-    pred = credit_model.predict_single(data)
+    # prediction and explanation
+    if config.EXPLAINER_BACKEND == "shap":
+        pred = model_registry.predict_single(data)
+        exp = shap_explainer.explain_single(data, approximate=config.EXPLAIN_APPROXIMATE["full_analysis"])
+    else:
+        pred, exp = model_registry.predict_and_explain(data, approximate=config.EXPLAIN_APPROXIMATE["full_analysis"])
     
     # fraud
     fraud = fraud_model.detect_fraud(data)
     
-    # explanation
-    exp = shap_explainer.explain_single(data)
-    
     # similar cases
     similar = case_retrieval.find_similar(data, num_results=3)
     summary = case_retrieval.get_similar_summary(similar)
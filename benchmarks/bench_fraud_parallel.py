@@ -0,0 +1,83 @@
+# bench_fraud_parallel.py
+# bulk fraud scoring throughput across worker counts
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import config
+from models.fraud_detector import AksumFraudDetector
+from utils.parallel import get_num_jobs
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="Parallel fraud scoring benchmark")
+    parser.add_argument("--model-dir", default=str(config.MODEL_DIR))
+    parser.add_argument("--data", default=str(config.DATA_DIR / "customer_data.csv"))
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--backend", default="native", choices=["native", "onnx"])
+    args = parser.parse_args()
+    
+    # bulk path only, sklearn or onnx in every worker
+    detector = AksumFraudDetector()
+    detector.backend = args.backend
+    detector.use_fast_scorer = False
+    detector.load_detector(args.model_dir)
+    
+    # tile the sample portfolio up to the requested size
+    data = pd.read_csv(args.data)
+    X = data[config.FEATURE_NAMES]
+    repeats = int(np.ceil(args.rows / len(X)))
+    X = pd.concat([X] * repeats, ignore_index=True).iloc[:args.rows]
+    
+    max_jobs = get_num_jobs(-1)
+    job_counts = [1]
+    while job_counts[-1] * 2 <= max_jobs:
+        job_counts.append(job_counts[-1] * 2)
+    if job_counts[-1] != max_jobs:
+        job_counts.append(max_jobs)
+    
+    print("")
+    print("=" * 50)
+    print("AKSUM PARALLEL FRAUD SCORING (" + str(len(X)) + " rows, " + args.backend + ")")
+    print("=" * 50)
+    print("jobs    seconds    rows/sec    speedup")
+    
+    baseline = None
+    reference = None
+    
+    try:
+        for n_jobs in job_counts:
+            
+            # one job is the serial in process path
+            detector.score_jobs = n_jobs
+            
+            # warm up the pool so start up is not timed
+            if n_jobs > 1:
+                detector.score_matrix(X.iloc[:config.FRAUD_PARALLEL_MIN_ROWS])
+            
+            start = time.perf_counter()
+            prediction, scores = detector.score_matrix(X)
+            elapsed = time.perf_counter() - start
+            
+            if reference is None:
+                reference = scores
+                baseline = elapsed
+            elif not np.array_equal(reference, scores):
+                print("Scores differ at " + str(n_jobs) + " jobs")
+                sys.exit(1)
+            
+            print(str(n_jobs).ljust(8) + str(round(elapsed, 3)).ljust(11) + str(int(len(X) / elapsed)).ljust(12) + str(round(baseline / elapsed, 2)) + "x")
+    finally:
+        detector.close_pool()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,109 @@
+# bench_fraud_scoring.py
+# compare fraud scoring paths for identical output and latency
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import config
+from models.fraud_detector import AksumFraudDetector
+from models.fast_isolation_forest import export_isolation_forest
+from models.fast_isolation_forest import AksumFastIsolationForest
+
+
+def time_call(func, repeats):
+    
+    start = time.perf_counter()
+    for i in range(repeats):
+        result = func()
+    elapsed_ms = (time.perf_counter() - start) / repeats * 1000
+    
+    return result, elapsed_ms
+
+
+def route_name(X):
+    
+    # same cutoff as AksumFraudDetector.score_matrix
+    if len(X) <= config.FRAUD_FAST_SCORER_MAX_ROWS:
+        return "numpy scorer"
+    return "sklearn"
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="Fraud scoring benchmark")
+    parser.add_argument("--model-dir", default=str(config.MODEL_DIR))
+    parser.add_argument("--data", default=str(config.DATA_DIR / "customer_data.csv"))
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+    
+    detector = AksumFraudDetector()
+    detector.backend = "native"
+    detector.use_fast_scorer = False
+    detector.load_detector(args.model_dir)
+    
+    fast_scorer = AksumFastIsolationForest(export_isolation_forest(detector.scaler, detector.isolation_forest))
+    
+    # score_matrix picks between the numpy scorer and sklearn by batch size
+    detector.fast_scorer = fast_scorer
+    
+    data = pd.read_csv(args.data)
+    X = data[config.FEATURE_NAMES]
+    
+    # tile the sample portfolio up to a bulk sized batch
+    num_tiles = int(np.ceil(args.rows / len(X)))
+    X_bulk = pd.concat([X] * num_tiles, ignore_index=True).iloc[:args.rows]
+    
+    cases = [
+        ("single customer", X.iloc[:1], args.repeats),
+        ("batch of " + str(len(X)), X, 10),
+        ("bulk of " + str(len(X_bulk)), X_bulk, 3),
+    ]
+    
+    def two_pass(X_in):
+        # previous path, walks the forest twice
+        X_scaled = detector.scaler.transform(X_in)
+        prediction = detector.isolation_forest.predict(X_scaled)
+        score = detector.isolation_forest.score_samples(X_scaled)
+        return prediction, score
+    
+    def one_pass(X_in):
+        return detector.score_matrix(X_in)
+    
+    def numpy_pass(X_in):
+        score = fast_scorer.score_samples(X_in)
+        return detector.get_anomaly_prediction(score), score
+    
+    print("")
+    print("=" * 50)
+    print("AKSUM FRAUD SCORING BENCHMARK")
+    print("=" * 50)
+    
+    for label, X_in, repeats in cases:
+        
+        old_result, old_ms = time_call(lambda: two_pass(X_in), repeats)
+        new_result, new_ms = time_call(lambda: one_pass(X_in), repeats)
+        fast_result, fast_ms = time_call(lambda: numpy_pass(X_in), repeats)
+        
+        same = np.array_equal(old_result[0], new_result[0]) and np.array_equal(old_result[1], new_result[1])
+        fast_same = np.array_equal(old_result[0], fast_result[0]) and np.array_equal(old_result[1], fast_result[1])
+        
+        print("")
+        print(label + " (routed to " + route_name(X_in) + "):")
+        print("  predict + score_samples: " + str(round(old_ms, 3)) + " ms")
+        print("  score_matrix:            " + str(round(new_ms, 3)) + " ms  identical " + str(same))
+        print("  numpy scorer:            " + str(round(fast_ms, 3)) + " ms  identical " + str(fast_same))
+        
+        if not same or not fast_same:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
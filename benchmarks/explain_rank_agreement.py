@@ -0,0 +1,121 @@
+# explain_rank_agreement.py
+# how often approximate contributions pick the same top factors as exact tree shap
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import config
+from models.xgboost_model import AksumCreditModel
+from explainability.contributions import select_top_k
+
+
+def get_rank_agreement(exact, approx, k):
+    
+    # top k features by absolute contribution, per row
+    exact_top = select_top_k(np.abs(exact), k)
+    approx_top = select_top_k(np.abs(approx), k)
+    
+    overlap = (exact_top[:, :, None] == approx_top[:, None, :]).any(axis=2).sum(axis=1) / k
+    
+    # do the exact top features push risk the same way in both modes
+    exact_sign = np.sign(np.take_along_axis(exact, exact_top, axis=1))
+    approx_sign = np.sign(np.take_along_axis(approx, exact_top, axis=1))
+    
+    result = {
+        "top_k": k,
+        "first_match_rate": round(float(np.mean(exact_top[:, 0] == approx_top[:, 0])), 4),
+        "mean_overlap": round(float(np.mean(overlap)), 4),
+        "exact_order_rate": round(float(np.mean(np.all(exact_top == approx_top, axis=1))), 4),
+        "sign_agreement": round(float(np.mean(exact_sign == approx_sign)), 4),
+    }
+    
+    return result
+
+
+def get_spearman(exact, approx):
+    
+    # rank correlation of absolute impacts over all features, per row
+    num_features = exact.shape[1]
+    exact_rank = np.argsort(np.argsort(-np.abs(exact), axis=1), axis=1)
+    approx_rank = np.argsort(np.argsort(-np.abs(approx), axis=1), axis=1)
+    
+    d_squared = np.sum((exact_rank - approx_rank) ** 2, axis=1)
+    spearman = 1 - 6 * d_squared / (num_features * (num_features ** 2 - 1))
+    
+    return float(np.mean(spearman))
+
+
+def time_single_row(model, X, approximate, repeats):
+    
+    one_row = X[:1]
+    model.predict_with_contributions(one_row, approximate=approximate)
+    
+    start = time.perf_counter()
+    for i in range(repeats):
+        model.predict_with_contributions(one_row, approximate=approximate)
+    
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="Exact vs approximate contribution agreement")
+    parser.add_argument("--model", default=str(config.MODEL_DIR / "aksum_credit_model.pkl"))
+    parser.add_argument("--data", default=str(config.DATA_DIR / "customer_data.csv"))
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--output", default="", help="optional csv path for the report")
+    args = parser.parse_args()
+    
+    model = AksumCreditModel()
+    model.load_model(args.model)
+    
+    data = pd.read_csv(args.data)
+    X = data[config.FEATURE_NAMES].to_numpy(dtype=float)
+    
+    prob_exact, exact, base_exact = model.predict_with_contributions(X)
+    prob_approx, approx, base_approx = model.predict_with_contributions(X, approximate=True)
+    
+    report = []
+    for k in [1, 3, 5]:
+        report.append(get_rank_agreement(exact, approx, k))
+    
+    spearman = get_spearman(exact, approx)
+    exact_ms = time_single_row(model, X, False, args.repeats)
+    approx_ms = time_single_row(model, X, True, args.repeats)
+    
+    print("")
+    print("=" * 60)
+    print("AKSUM EXACT VS APPROXIMATE CONTRIBUTIONS (" + str(len(X)) + " customers)")
+    print("=" * 60)
+    print("top_k    first_match    overlap    same_order    sign_agree")
+    for row in report:
+        line = str(row["top_k"]).ljust(9)
+        line = line + str(row["first_match_rate"]).ljust(15)
+        line = line + str(row["mean_overlap"]).ljust(11)
+        line = line + str(row["exact_order_rate"]).ljust(14)
+        line = line + str(row["sign_agreement"])
+        print(line)
+    print("")
+    print("Mean spearman (all features): " + str(round(spearman, 4)))
+    print("Max probability diff: " + str(float(np.max(np.abs(prob_exact - prob_approx)))))
+    print("Single row latency exact: " + str(round(exact_ms, 4)) + " ms")
+    print("Single row latency approximate: " + str(round(approx_ms, 4)) + " ms")
+    print("")
+    print("Configured endpoints:")
+    for name, approximate in config.EXPLAIN_APPROXIMATE.items():
+        print("  " + name + ": " + ("approximate" if approximate else "exact"))
+    
+    if args.output != "":
+        pd.DataFrame(report).to_csv(args.output, index=False)
+        print("Report saved to: " + args.output)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
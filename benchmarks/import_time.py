@@ -0,0 +1,128 @@
+# import_time.py
+# import latency of each entry point, measured with python -X importtime
+
+import argparse
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+ENTRY_POINTS = [
+    "config",
+    "api.main",
+    "models.xgboost_model",
+    "models.fraud_detector",
+    "models.model_registry",
+    "explainability.contributions",
+    "explainability.shap_explainer",
+    "vector_store.case_retrieval",
+    "llm_agent.risk_reasoning",
+]
+
+HEAVY_MODULES = [
+    "pandas",
+    "xgboost",
+    "sklearn",
+    "shap",
+    "matplotlib",
+    "faiss",
+    "google.generativeai",
+    "dotenv",
+]
+
+
+def run_import(module):
+    
+    # fresh interpreter each time so nothing is cached in sys.modules
+    code = "import sys\n"
+    if module != "":
+        code = code + "import " + module + "\n"
+    code = code + "print(','.join(m for m in " + repr(HEAVY_MODULES) + " if m in sys.modules))"
+    
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True
+    )
+    
+    if result.returncode != 0:
+        raise RuntimeError("Import of " + module + " failed:\n" + result.stderr[-2000:])
+    
+    # top level lines only, nested imports are already in their parent's cumulative
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        name = parts[2].rstrip()
+        if name.startswith(" ") and not name.startswith("  "):
+            timings[name.strip()] = int(parts[1])
+    
+    heavy = [m for m in result.stdout.strip().split(",") if m != ""]
+    
+    return timings, heavy
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="Import time per entry point")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=3, help="slowest top level imports to list")
+    parser.add_argument("--output", default="", help="optional csv path for the report")
+    args = parser.parse_args()
+    
+    # interpreter start up imports, subtracted from every entry point
+    baseline = []
+    for i in range(args.repeats):
+        timings, heavy = run_import("")
+        baseline.append(sum(timings.values()))
+    baseline_us = float(np.median(baseline))
+    
+    report = []
+    slowest = {}
+    
+    for module in ENTRY_POINTS:
+        
+        totals = []
+        for i in range(args.repeats):
+            timings, heavy = run_import(module)
+            totals.append(sum(timings.values()))
+        
+        report.append({
+            "entry_point": module,
+            "import_ms": round((float(np.median(totals)) - baseline_us) / 1000, 1),
+            "heavy_modules": " ".join(heavy),
+        })
+        
+        ordered = sorted(timings.items(), key=lambda x: x[1], reverse=True)
+        slowest[module] = ordered[:args.top]
+    
+    print("")
+    print("=" * 70)
+    print("AKSUM IMPORT TIME (median of " + str(args.repeats) + " runs, start up subtracted)")
+    print("=" * 70)
+    print("entry_point                        import_ms    heavy modules loaded")
+    for row in report:
+        print(row["entry_point"].ljust(35) + str(row["import_ms"]).ljust(13) + row["heavy_modules"])
+    
+    print("")
+    print("Slowest top level imports:")
+    for module in ENTRY_POINTS:
+        items = []
+        for name, micros in slowest[module]:
+            items.append(name + " " + str(round(micros / 1000, 1)) + "ms")
+        print("  " + module + ": " + ", ".join(items))
+    
+    if args.output != "":
+        pd.DataFrame(report).to_csv(args.output, index=False)
+        print("Report saved to: " + args.output)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,55 @@
+# tier_report.py
+# offline auc and latency report for truncated tree ensembles
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import config
+from models.xgboost_model import AksumCreditModel
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="AUC and latency across number of trees")
+    parser.add_argument("--model", default=str(config.MODEL_DIR / "aksum_credit_model.pkl"))
+    parser.add_argument("--step", type=int, default=10)
+    parser.add_argument("--output", default="", help="optional csv path for the report")
+    args = parser.parse_args()
+    
+    model = AksumCreditModel()
+    model.load_model(args.model)
+    
+    # holdout saved with the model, never rows it was trained on
+    X_test, y_test = model.load_holdout(args.model)
+    if X_test is None:
+        print("No holdout saved for this model, it was trained on every row")
+        sys.exit(1)
+    
+    tree_counts = model.get_tree_counts(args.step)
+    
+    report = model.tier_report(X_test, y_test, tree_counts=tree_counts)
+    
+    print("")
+    print("=" * 45)
+    print("AKSUM PREDICTION TIER REPORT")
+    print("=" * 45)
+    print("num_trees    auc_roc    latency_ms")
+    for row in report:
+        print(str(row["num_trees"]).ljust(13) + str(row["auc_roc"]).ljust(11) + str(row["latency_ms"]))
+    print("")
+    print("Configured tiers:")
+    for name, num_trees in config.PREDICTION_TIERS.items():
+        print("  " + name + ": " + (str(num_trees) if num_trees > 0 else "all") + " trees")
+    
+    if args.output != "":
+        pd.DataFrame(report).to_csv(args.output, index=False)
+        print("Report saved to: " + args.output)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
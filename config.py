@@ -1,42 +1,60 @@
 # config file for aksum credit risk engine
+# importing this file has no side effects, the env file and
+# folders are handled by load_env() and ensure_dirs()
 
 import os
 from pathlib import Path
 
-# load env file
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except:
-    pass
-
 # folders
 BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"
 MODEL_DIR = BASE_DIR / "saved_models"
 VECTOR_DIR = BASE_DIR / "vector_data"
 
-# make folders
-try:
-    MODEL_DIR.mkdir(exist_ok=True)
-except:
-    pass
+env_loaded = False
+
+
+def load_env():
+    
+    # load env file once, on first use of a secret
+    global env_loaded
+    if env_loaded:
+        return
+    env_loaded = True
+    
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except:
+        pass
+
+
+def ensure_dirs():
+    
+    # make folders before anything is saved into them
+    for folder in [MODEL_DIR, VECTOR_DIR]:
+        try:
+            folder.mkdir(exist_ok=True)
+        except:
+            pass
+
+
+def get_gemini_api_key():
+    load_env()
+    return os.getenv("GEMINI_API_KEY", "")
 
-try:
-    VECTOR_DIR.mkdir(exist_ok=True)
-except:
-    pass
 
-# gemini key
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+def is_gemini_enabled():
+    
+    # check key
+    key = get_gemini_api_key()
+    if key == "":
+        return False
+    elif key == "paste_your_key_here":
+        return False
+    else:
+        return True
 
-# check key
-if GEMINI_API_KEY == "":
-    GEMINI_ENABLED = False
-elif GEMINI_API_KEY == "paste_your_key_here":
-    GEMINI_ENABLED = False
-else:
-    GEMINI_ENABLED = True
 
 # model settings
 RANDOM_STATE = 42
@@ -45,6 +63,20 @@ N_ESTIMATORS = 100
 MAX_DEPTH = 5
 LEARNING_RATE = 0.1
 
+# incremental retrain settings
+INCREMENTAL_ROUNDS = 20
+# warm starts stop here, past this a full retrain resets the ensemble
+INCREMENTAL_MAX_TREES = 200
+INCREMENTAL_MAX_AUC_DROP = 0.01
+# new labels need both classes and at least this many rows
+INCREMENTAL_MIN_ROWS = 50
+
+# prediction tiers (number of trees, 0 means all)
+PREDICTION_TIERS = {
+    "full": 0,
+    "fast": 30,
+}
+
 # strict threshold
 STRICT_LOW = 0.30
 STRICT_MEDIUM = 0.50
@@ -74,19 +106,149 @@ FEATURE_NAMES = [
     "late_payment_rate",
 ]
 
+# shadow scoring settings
+# challenger name -> model path, empty means no shadow scoring
+CHALLENGER_MODELS = {}
+SHADOW_LOG_PATH = MODEL_DIR / "shadow_log.csv"
+SHADOW_BATCH_SIZE = 256
+SHADOW_QUEUE_SIZE = 10000
+
+# response surfaces for dashboard sliders
+# slider -> (min, max, step) of the precomputed grid
+RESPONSE_SURFACES = {
+    "quick_check": {
+        "delay": (0, 90, 2),
+        "utilization": (0, 150, 5),
+        "late_rate": (0, 100, 5),
+        "dispute_rate": (0, 50, 5),
+    },
+    "risk_calculator": {
+        "delay": (0, 90, 5),
+        "utilization": (0, 150, 10),
+        "late_rate": (0, 100, 5),
+        "dispute_rate": (0, 50, 5),
+        "order_frequency": (1, 30, 1),
+    },
+}
+SURFACE_BATCH_SIZE = 200000
+# off-grid check against the model after each build
+SURFACE_PARITY_POINTS = 2000
+SURFACE_PARITY_MAX_ERROR = 0.05
+SURFACE_PARITY_MIN_AGREEMENT = 0.98
+
+# inference backend ("native" or "onnx")
+INFERENCE_BACKEND = "native"
+ONNX_INTRA_OP_THREADS = 1
+ONNX_OPSET = 15
+ONNX_PARITY_TOLERANCE = 1e-4
+
 # api settings
 API_HOST = "127.0.0.1"
 API_PORT = 8000
 
+# explanations at serving time
+# "contribs" uses xgboost pred_contribs, "shap" uses shap.TreeExplainer
+EXPLAINER_BACKEND = "contribs"
+
+# shap backend only, "interventional" uses the background sample saved with the model
+EXPLAIN_PERTURBATION = "tree_path_dependent"
+EXPLAIN_BACKGROUND_SIZE = 100
+
+# "top_k" keeps only the strongest factors each way, "full" lists every feature
+EXPLAIN_MODE = "full"
+EXPLAIN_TOP_K = 3
+
+# approximate (saabas) contributions per endpoint, exact tree shap when False
+# see benchmarks/explain_rank_agreement.py before switching one on
+EXPLAIN_APPROXIMATE = {
+    "explain": False,
+    "full_analysis": False,
+}
+
+# portfolio shap store, segment column is optional in the portfolio file
+SHAP_STORE_DIR = MODEL_DIR / "shap_store"
+SHAP_STORE_CHUNK_SIZE = 50000
+SHAP_STORE_SEGMENT_COLUMN = "segment"
+
+# shap interaction job, memory budget covers all workers (-1 means all cores)
+SHAP_INTERACTION_N_JOBS = -1
+SHAP_INTERACTION_MEMORY_MB = 512
+
+# batch explanation charts (-1 means all cores)
+PLOT_N_JOBS = -1
+PLOT_CHUNK_SIZE = 200
+PLOT_TOP_N = 10
+
+# explanation cache, set EXPLAIN_CACHE_PATH to a sqlite file to keep it across restarts
+EXPLAIN_CACHE_SIZE = 10000
+EXPLAIN_CACHE_PATH = None
+EXPLAIN_CACHE_DISK_SIZE = 200000
+
 # vector settings
 VECTOR_DIM = 15
 NUM_NEIGHBORS = 5
 
+# near duplicate customers, squared l2 on 0-1 normalized features
+DUPLICATE_RADIUS = 0.001
+DUPLICATE_NEIGHBORS = 10
+DUPLICATE_CHUNK_SIZE = 10000
+
 # gemini model
 GEMINI_MODEL = "gemini-2.5-flash"
 
 # fraud settings
 FRAUD_CONTAMINATION = 0.05
+FRAUD_FAST_SCORER = True
+FRAUD_SCORER_CHUNK_SIZE = 10000
+# numpy scorer wins on small batches, sklearn is faster in bulk
+FRAUD_FAST_SCORER_MAX_ROWS = 1000
+
+# versioned fraud artifact bundle (manifest + memory mapped arrays)
+FRAUD_BUNDLE_NAME = "fraud_bundle"
+FRAUD_BUNDLE_VERIFY = True
+
+# fraud threshold sketch, percentiles are exact below k scores
+FRAUD_SKETCH_K = 2000
+FRAUD_THRESHOLD_QUANTILES = {
+    "very_suspicious": 0.01,
+    "suspicious": 0.05,
+    "unusual": 0.10,
+    "normal": 0.50,
+}
+
+# online fraud detector (half-space trees) for live updates
+FRAUD_ONLINE_ENABLED = False
+FRAUD_ONLINE_TREES = 25
+FRAUD_ONLINE_DEPTH = 10
+FRAUD_ONLINE_WINDOW = 1000
+FRAUD_ONLINE_SIZE_LIMIT = 0.1
+
+# parallel fraud training and scoring (-1 means all cores)
+FRAUD_N_JOBS = -1
+FRAUD_PARALLEL_MIN_ROWS = 50000
+
+# streaming fraud sweep settings
+FRAUD_SWEEP_CHUNK_SIZE = 50000
+FRAUD_FLAG_LEVELS = ["VERY HIGH", "HIGH"]
+
+# suspicious pattern rules
+# a json file at FRAUD_RULES_PATH replaces these without a deploy
+FRAUD_RULES_PATH = MODEL_DIR / "fraud_rules.json"
+FRAUD_RULES = [
+    {"feature": "payment_delay_days_avg", "op": ">", "threshold": 45, "reason": "Very high payment delays"},
+    {"feature": "credit_utilization_pct", "op": ">", "threshold": 100, "reason": "Over credit limit"},
+    {"feature": "dispute_rate", "op": ">", "threshold": 20, "reason": "Too many disputes"},
+    {"feature": "late_payment_rate", "op": ">", "threshold": 40, "reason": "Excessive late payments"},
+    {"feature": "lead_time_variance", "op": ">", "threshold": 20, "reason": "Irregular ordering pattern"},
+    {
+        "feature": "order_frequency_per_month",
+        "reason": "Low orders but high credit usage",
+        "all": [
+            {"feature": "order_frequency_per_month", "op": "<", "threshold": 2},
+            {"feature": "credit_utilization_pct", "op": ">", "threshold": 80},
+        ],
+    },
+]
 
 # company
 COMPANY_NAME = "Aksum"
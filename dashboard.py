@@ -104,33 +104,35 @@ st.markdown("""
 def load_models():
     
     from models.xgboost_model import AksumCreditModel
+    from models.response_surface import load_surfaces
     from models.fraud_detector import AksumFraudDetector
     from explainability.shap_explainer import AksumExplainer
     from vector_store.case_retrieval import AksumCaseRetrieval
     from llm_agent.risk_reasoning import AksumLLMAgent
     import config
     
+    model_path = "saved_models/aksum_credit_model.pkl"
     model = AksumCreditModel()
-    model.load_model("saved_models/aksum_credit_model.pkl")
+    model.load_model(model_path)
+    
+    # slider pages answer from precomputed grids
+    surfaces = load_surfaces(model)
     
     fraud = AksumFraudDetector()
     fraud.load_detector("saved_models")
     
-    data = pd.read_csv("data/customer_data.csv")
-    X = data[config.FEATURE_NAMES]
-    
-    explainer = AksumExplainer(model.model)
-    explainer.setup_explainer(X)
+    # tree explainer is built on the first explanation
+    explainer = AksumExplainer(model.model, model.get_background_path(model_path))
     
     retrieval = AksumCaseRetrieval()
     retrieval.load_index("vector_data")
     
     llm = AksumLLMAgent()
     
-    return model, fraud, explainer, retrieval, llm
+    return model, surfaces, fraud, explainer, retrieval, llm
 
 
-model, fraud_detector, explainer, retrieval, llm_agent = load_models()
+model, surfaces, fraud_detector, explainer, retrieval, llm_agent = load_models()
 
 
 # sidebar
@@ -836,30 +838,17 @@ elif page == "📊 Quick Assessment":
     
     if quick_check:
         
-        # create customer with defaults
-        customer = {
-            "avg_monthly_orders": 10.0,
-            "total_purchase_amount": 500000.0,
-            "avg_order_value": 4166.67,
-            "payment_delay_days_avg": float(quick_delay),
-            "payment_delay_days_max": float(quick_delay * 1.5),
-            "credit_limit": 500000.0,
-            "credit_utilization_pct": float(quick_util),
-            "num_invoices": 50,
-            "num_disputed_invoices": int(50 * quick_dispute / 100),
-            "dispute_rate": float(quick_dispute),
-            "days_since_first_order": 365,
-            "order_frequency_per_month": 5.0,
-            "lead_time_variance": 5.0,
-            "num_late_payments": int(50 * quick_late_rate / 100),
-            "late_payment_rate": float(quick_late_rate),
+        # lookup on precomputed grid with quick check defaults
+        sliders = {
+            "delay": quick_delay,
+            "utilization": quick_util,
+            "late_rate": quick_late_rate,
+            "dispute_rate": quick_dispute,
         }
+        prob = surfaces["quick_check"].lookup(sliders)
+        cat = model.get_risk_category(prob, mode)
         
-        # predict
-        prediction = model.predict_single(customer)
-        cat = model.get_risk_category(prediction["default_probability"], mode)
-        
-        prob_pct = round(prediction["default_probability"] * 100, 1)
+        prob_pct = round(prob * 100, 1)
         
         # colors
         if cat == "LOW":
@@ -946,28 +935,17 @@ elif page == "📈 Risk Calculator":
     
     with col2:
         
-        # calculate risk
-        customer = {
-            "avg_monthly_orders": float(calc_freq),
-            "total_purchase_amount": 500000.0,
-            "avg_order_value": 4000.0,
-            "payment_delay_days_avg": float(calc_delay),
-            "payment_delay_days_max": float(calc_delay * 1.5),
-            "credit_limit": 500000.0,
-            "credit_utilization_pct": float(calc_util),
-            "num_invoices": 50,
-            "num_disputed_invoices": int(50 * calc_dispute / 100),
-            "dispute_rate": float(calc_dispute),
-            "days_since_first_order": 365,
-            "order_frequency_per_month": float(calc_freq),
-            "lead_time_variance": 5.0,
-            "num_late_payments": int(50 * calc_late / 100),
-            "late_payment_rate": float(calc_late),
+        # calculate risk from precomputed grid
+        sliders = {
+            "delay": calc_delay,
+            "utilization": calc_util,
+            "late_rate": calc_late,
+            "dispute_rate": calc_dispute,
+            "order_frequency": calc_freq,
         }
-        
-        prediction = model.predict_single(customer)
-        cat = model.get_risk_category(prediction["default_probability"], mode)
-        prob_pct = round(prediction["default_probability"] * 100, 1)
+        prob = surfaces["risk_calculator"].lookup(sliders)
+        cat = model.get_risk_category(prob, mode)
+        prob_pct = round(prob * 100, 1)
         
         if cat == "LOW":
             color = "#00ff88"
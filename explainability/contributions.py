@@ -0,0 +1,143 @@
+# contributions.py
+# explanations from xgboost's own tree shap output, no shap package needed
+
+import numpy as np
+import sys
+
+sys.path.append("..")
+import config
+
+
+def select_top_k(values, k):
+    
+    # indexes of the k largest values per row, largest first
+    # partial selection, only the k winners get sorted
+    values = np.atleast_2d(values)
+    k = min(k, values.shape[1])
+    
+    if k < values.shape[1]:
+        idx = np.argpartition(-values, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.tile(np.arange(values.shape[1]), (values.shape[0], 1))
+    
+    top = np.take_along_axis(values, idx, axis=1)
+    order = np.argsort(-top, axis=1, kind="stable")
+    
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def get_cache_extra(backend, tier, approximate):
+    
+    # pred_contribs is always path dependent, only shap reads the setting
+    if backend == "shap":
+        perturbation = config.EXPLAIN_PERTURBATION
+    else:
+        perturbation = "tree_path_dependent"
+    
+    # settings that change an explanation for the same features
+    return backend + "|" + tier + "|" + config.EXPLAIN_MODE + "|" + perturbation + "|" + str(approximate)
+
+
+def build_explanation(feature_names, shap_vals, feature_vals, base_val, mode=None):
+    
+    if mode is None:
+        mode = config.EXPLAIN_MODE
+    
+    if mode == "top_k":
+        return build_top_k_explanation(feature_names, shap_vals, feature_vals, base_val)
+    
+    return build_full_explanation(feature_names, shap_vals, feature_vals, base_val)
+
+
+def build_top_k_explanation(feature_names, shap_vals, feature_vals, base_val, top_k=None):
+    
+    # only the strongest contributors each way, no per feature dicts
+    if top_k is None:
+        top_k = config.EXPLAIN_TOP_K
+    
+    shap_vals = np.asarray(shap_vals, dtype=np.float64)
+    feature_vals = np.asarray(feature_vals, dtype=np.float64)
+    
+    risk_idx = select_top_k(shap_vals, top_k)[0]
+    risk_idx = risk_idx[shap_vals[risk_idx] > 0]
+    
+    positive_idx = select_top_k(-shap_vals, top_k)[0]
+    positive_idx = positive_idx[shap_vals[positive_idx] < 0]
+    
+    explanation = {
+        "base_risk_score": float(round(base_val, 4)),
+        "top_3_risk_factors": compact_factors(feature_names, risk_idx, shap_vals, feature_vals),
+        "top_3_positive_factors": compact_factors(feature_names, positive_idx, shap_vals, feature_vals),
+    }
+    
+    return explanation
+
+
+def compact_factors(feature_names, idx, shap_vals, feature_vals):
+    
+    rounded = np.round(shap_vals[idx], 4)
+    
+    factors = []
+    for i in range(len(idx)):
+        factors.append({
+            "feature": feature_names[idx[i]],
+            "value": float(feature_vals[idx[i]]),
+            "shap_value": float(rounded[i]),
+        })
+    
+    return factors
+
+
+def build_full_explanation(feature_names, shap_vals, feature_vals, base_val):
+    
+    # feature_vals is in the same order as feature_names
+    impacts = []
+    
+    for i in range(len(feature_names)):
+        
+        feat_name = feature_names[i]
+        feat_value = feature_vals[i]
+        shap_value = shap_vals[i]
+        
+        # determine impact direction
+        if shap_value > 0:
+            direction = "increases_risk"
+        elif shap_value < 0:
+            direction = "decreases_risk"
+        else:
+            direction = "no_impact"
+        
+        impact = {
+            "feature": feat_name,
+            "value": float(feat_value),
+            "shap_value": float(round(shap_value, 4)),
+            "direction": direction,
+            "abs_impact": float(abs(round(shap_value, 4)))
+        }
+        
+        impacts.append(impact)
+    
+    # sort by absolute impact
+    impacts.sort(key=lambda x: x["abs_impact"], reverse=True)
+    
+    # get top risk factors
+    risk_factors = []
+    for item in impacts:
+        if item["direction"] == "increases_risk":
+            risk_factors.append(item)
+    
+    # get top positive factors
+    positive_factors = []
+    for item in impacts:
+        if item["direction"] == "decreases_risk":
+            positive_factors.append(item)
+    
+    # build explanation
+    explanation = {
+        "base_risk_score": float(round(base_val, 4)),
+        "all_impacts": impacts,
+        "top_3_risk_factors": risk_factors[:3],
+        "top_3_positive_factors": positive_factors[:3],
+    }
+    
+    return explanation
\ No newline at end of file
@@ -0,0 +1,157 @@
+# explanation_cache.py
+# lru cache of explanations with an optional sqlite tier
+
+from collections import OrderedDict
+import hashlib
+import json
+import numpy as np
+import sqlite3
+import sys
+import threading
+
+sys.path.append("..")
+import config
+
+
+class AksumExplanationCache:
+    
+    def __init__(self, max_size=None, disk_path=None, disk_max_size=None):
+        
+        self.max_size = max_size if max_size is not None else config.EXPLAIN_CACHE_SIZE
+        self.disk_path = disk_path if disk_path is not None else config.EXPLAIN_CACHE_PATH
+        self.disk_max_size = disk_max_size if disk_max_size is not None else config.EXPLAIN_CACHE_DISK_SIZE
+        self.model_version = None
+        
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.connection = None
+        
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        
+        if self.disk_path is not None:
+            self.open_disk()
+    
+    
+    def open_disk(self):
+        
+        # api handlers may run on different threads
+        self.connection = sqlite3.connect(str(self.disk_path), check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS explanations "
+            "(key TEXT PRIMARY KEY, model_version TEXT, explanation TEXT)"
+        )
+        self.connection.commit()
+    
+    
+    def make_key(self, features, extra=""):
+        
+        # same feature values and model give the same explanation
+        features = np.ascontiguousarray(features, dtype=np.float64)
+        
+        digest = hashlib.sha256(features.tobytes())
+        digest.update((str(self.model_version) + "|" + str(extra)).encode())
+        
+        return digest.hexdigest()
+    
+    
+    def set_model_version(self, model_version):
+        
+        if model_version == self.model_version:
+            return
+        
+        self.model_version = model_version
+        self.invalidate()
+    
+    
+    def invalidate(self):
+        
+        # entries of older models can never be hit again
+        with self.lock:
+            self.entries.clear()
+            
+            if self.connection is not None:
+                self.connection.execute(
+                    "DELETE FROM explanations WHERE model_version != ?",
+                    (str(self.model_version),)
+                )
+                self.connection.commit()
+    
+    
+    def get(self, key):
+        
+        with self.lock:
+            
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits = self.hits + 1
+                return self.entries[key]
+            
+            if self.connection is not None:
+                row = self.connection.execute(
+                    "SELECT explanation FROM explanations WHERE key = ?", (key,)
+                ).fetchone()
+                
+                if row is not None:
+                    explanation = json.loads(row[0])
+                    self.disk_hits = self.disk_hits + 1
+                    self.store(key, explanation)
+                    return explanation
+            
+            self.misses = self.misses + 1
+            return None
+    
+    
+    def put(self, key, explanation):
+        
+        with self.lock:
+            
+            self.store(key, explanation)
+            
+            if self.connection is not None:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO explanations VALUES (?, ?, ?)",
+                    (key, str(self.model_version), json.dumps(explanation))
+                )
+                
+                # replace gives the row a new rowid, so the lowest ones are the oldest
+                self.connection.execute(
+                    "DELETE FROM explanations WHERE rowid <= "
+                    "(SELECT MAX(rowid) FROM explanations) - ?",
+                    (self.disk_max_size,)
+                )
+                self.connection.commit()
+    
+    
+    def store(self, key, explanation):
+        
+        # caller holds the lock
+        self.entries[key] = explanation
+        self.entries.move_to_end(key)
+        
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+    
+    
+    def get_stats(self):
+        
+        total = self.hits + self.disk_hits + self.misses
+        
+        if total > 0:
+            hit_rate = round((self.hits + self.disk_hits) / total, 4)
+        else:
+            hit_rate = 0
+        
+        stats = {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "disk_max_size": self.disk_max_size,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hit_rate,
+            "model_version": self.model_version,
+        }
+        
+        return stats
\ No newline at end of file
@@ -0,0 +1,154 @@
+# plot_reports.py
+# explanation charts for many customers, headless and in parallel
+# matplotlib is only imported here, never by the api or dashboard
+
+import numpy as np
+import hashlib
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append("..")
+import config
+from utils.parallel import get_num_jobs
+
+
+# figure held by each pool worker, reused for every chart
+worker_figure = None
+
+
+def get_chart_filename(customer_id):
+    
+    # ids come from the portfolio file, keep only safe characters
+    # so a "/" or ".." can never leave the output folder
+    customer_id = str(customer_id)
+    name = re.sub(r"[^A-Za-z0-9_-]", "_", customer_id)
+    
+    # cleaned ids get a hash so two of them cannot share a file
+    if name != customer_id or name == "":
+        name = name + "_" + hashlib.sha256(customer_id.encode()).hexdigest()[:8]
+    
+    return name + ".png"
+
+
+def create_figure():
+    
+    # agg canvas directly, no pyplot state or gui backend
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figure)
+    
+    return figure
+
+
+def draw_impact_chart(figure, values, names, top_n=None):
+    
+    if top_n is None:
+        top_n = config.PLOT_TOP_N
+    
+    figure.clear()
+    ax = figure.add_subplot(1, 1, 1)
+    
+    # sort by absolute value
+    values = np.asarray(values)
+    top_idx = np.argsort(np.abs(values))[::-1][:top_n]
+    
+    top_values = values[top_idx]
+    top_names = [names[i] for i in top_idx]
+    
+    # colors based on positive/negative
+    colors = np.where(top_values > 0, "red", "green")
+    
+    y_pos = np.arange(len(top_names))
+    
+    ax.barh(y_pos, top_values, color=colors)
+    ax.set_yticks(y_pos)
+    ax.set_yticklabels(top_names)
+    ax.set_xlabel("SHAP Value (Impact on Risk)")
+    ax.set_title("Aksum Credit Risk - Feature Impact")
+    figure.tight_layout()
+    
+    return figure
+
+
+def save_impact_chart(values, names, save_path, figure=None):
+    
+    if figure is None:
+        figure = create_figure()
+    
+    draw_impact_chart(figure, values, names)
+    figure.savefig(save_path)
+    
+    return save_path
+
+
+def init_worker():
+    global worker_figure
+    worker_figure = create_figure()
+
+
+def render_chunk_in_worker(paths, values, names):
+    
+    for i in range(len(paths)):
+        save_impact_chart(values[i], names, paths[i], worker_figure)
+    
+    return len(paths)
+
+
+class AksumPlotReport:
+    
+    def __init__(self, n_jobs=None, chunk_size=None):
+        
+        self.feature_names = config.FEATURE_NAMES
+        self.n_jobs = get_num_jobs(n_jobs if n_jobs is not None else config.PLOT_N_JOBS)
+        self.chunk_size = chunk_size if chunk_size is not None else config.PLOT_CHUNK_SIZE
+        self.pool = None
+    
+    
+    def get_pool(self):
+        
+        # workers and their figures are kept across render calls
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.n_jobs, initializer=init_worker)
+        
+        return self.pool
+    
+    
+    def close_pool(self):
+        
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+    
+    
+    def render(self, shap_values, customer_ids, output_dir):
+        
+        # one png per customer, named by customer id
+        os.makedirs(output_dir, exist_ok=True)
+        
+        shap_values = np.asarray(shap_values, dtype=np.float32)
+        paths = []
+        for customer_id in customer_ids:
+            paths.append(os.path.join(output_dir, get_chart_filename(customer_id)))
+        
+        num_rendered = 0
+        pool = self.get_pool()
+        
+        futures = []
+        for begin in range(0, len(paths), self.chunk_size):
+            end = begin + self.chunk_size
+            futures.append(pool.submit(
+                render_chunk_in_worker,
+                paths[begin:end],
+                shap_values[begin:end],
+                list(self.feature_names)
+            ))
+        
+        for future in futures:
+            num_rendered = num_rendered + future.result()
+            print("Rendered " + str(num_rendered) + " of " + str(len(paths)) + " charts")
+        
+        return num_rendered
\ No newline at end of file
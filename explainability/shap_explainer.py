@@ -1,47 +1,93 @@
 # shap_explainer.py
 # explains why model gave that score
 
-import shap
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 import sys
 
 sys.path.append("..")
 import config
+from explainability.contributions import build_explanation
+from explainability.contributions import get_cache_extra
+from explainability.explanation_cache import AksumExplanationCache
+from utils.model_version import get_model_version
 
 
 class AksumExplainer:
     
-    def __init__(self, model):
+    def __init__(self, model, background_path=None):
         
         self.model = model
         self.explainer = None
         self.feature_names = config.FEATURE_NAMES
         
+        # only read when interventional shap needs a background
+        self.background_path = background_path
+        self.background = None
+        
+        self.cache = AksumExplanationCache()
+        self.cache.set_model_version(get_model_version(self.model))
+        
         print("Aksum Explainer created")
     
     
-    def setup_explainer(self, background_data):
+    def set_model(self, model):
         
-        print("Setting up SHAP explainer...")
+        # after a model reload, old explanations are dropped
+        self.model = model
+        self.cache.set_model_version(get_model_version(self.model))
+        
+        # rebuilt on next use
+        self.explainer = None
+    
+    
+    def setup_explainer(self, background_data=None):
         
         # use subset of data for speed on 8gb ram
-        if len(background_data) > 100:
-            sample_data = background_data.sample(n=100, random_state=42)
-        else:
-            sample_data = background_data
+        if background_data is not None:
+            size = config.EXPLAIN_BACKGROUND_SIZE
+            if len(background_data) > size:
+                background_data = background_data.sample(n=size, random_state=config.RANDOM_STATE)
+            self.background = np.asarray(background_data[self.feature_names], dtype=np.float32)
+        
+        return self.get_explainer()
+    
+    
+    def get_explainer(self):
         
-        # create tree explainer for xgboost
-        self.explainer = shap.TreeExplainer(self.model)
+        import shap
+        
+        # built on first use, straight from the model
+        if self.explainer is not None:
+            return self.explainer
+        
+        print("Setting up SHAP explainer...")
+        
+        if config.EXPLAIN_PERTURBATION == "interventional":
+            
+            # background sample saved next to the model
+            if self.background is None:
+                if self.background_path is None or not os.path.exists(str(self.background_path)):
+                    raise ValueError("Interventional SHAP needs a background sample")
+                self.background = np.load(str(self.background_path))
+            
+            self.explainer = shap.TreeExplainer(
+                self.model,
+                data=self.background,
+                feature_perturbation="interventional"
+            )
+        else:
+            # create tree explainer for xgboost
+            self.explainer = shap.TreeExplainer(self.model)
         
         print("Explainer ready")
         
         return self.explainer
     
     
-    def explain_single(self, customer_data):
+    def explain_single(self, customer_data, approximate=False):
+        
+        import pandas as pd
         
         # customer_data is dictionary
         # convert to dataframe
@@ -53,11 +99,21 @@ class AksumExplainer:
         # make sure columns in right order
         df = df[self.feature_names]
         
-        # get shap values
-        shap_values = self.explainer.shap_values(df)
+        # same profile and model were explained before
+        key = self.cache.make_key(df.values[0], get_cache_extra("shap", "full", approximate))
+        explanation = self.cache.get(key)
+        if explanation is not None:
+            return explanation
         
-        # get base value
-        base_value = self.explainer.expected_value
+        if approximate:
+            # saabas attributions straight from the booster
+            shap_values, base_value = self.get_approx_contributions(df)
+        else:
+            # get shap values
+            shap_values = self.get_explainer().shap_values(df)
+            
+            # get base value
+            base_value = self.get_explainer().expected_value
         
         # create explanation dictionary
         explanation = self.create_explanation(
@@ -66,62 +122,27 @@ class AksumExplainer:
             base_value
         )
         
+        self.cache.put(key, explanation)
+        
         return explanation
     
     
-    def create_explanation(self, shap_vals, feature_vals, base_val):
+    def get_approx_contributions(self, df):
         
-        # list to store feature impacts
-        impacts = []
+        import xgboost as xgb
         
-        for i in range(len(self.feature_names)):
-            
-            feat_name = self.feature_names[i]
-            feat_value = feature_vals[feat_name]
-            shap_value = shap_vals[i]
-            
-            # determine impact direction
-            if shap_value > 0:
-                direction = "increases_risk"
-            elif shap_value < 0:
-                direction = "decreases_risk"
-            else:
-                direction = "no_impact"
-            
-            impact = {
-                "feature": feat_name,
-                "value": float(feat_value),
-                "shap_value": float(round(shap_value, 4)),
-                "direction": direction,
-                "abs_impact": float(abs(round(shap_value, 4)))
-            }
-            
-            impacts.append(impact)
-        
-        # sort by absolute impact
-        impacts.sort(key=lambda x: x["abs_impact"], reverse=True)
-        
-        # get top risk factors
-        risk_factors = []
-        for item in impacts:
-            if item["direction"] == "increases_risk":
-                risk_factors.append(item)
-        
-        # get top positive factors
-        positive_factors = []
-        for item in impacts:
-            if item["direction"] == "decreases_risk":
-                positive_factors.append(item)
-        
-        # build explanation
-        explanation = {
-            "base_risk_score": float(round(base_val, 4)),
-            "all_impacts": impacts,
-            "top_3_risk_factors": risk_factors[:3],
-            "top_3_positive_factors": positive_factors[:3],
-        }
+        dmatrix = xgb.DMatrix(df.values.astype(float), feature_names=list(self.feature_names))
+        contribs = self.model.get_booster().predict(dmatrix, pred_contribs=True, approx_contribs=True)
         
-        return explanation
+        # last column is the bias, same role as expected_value
+        return contribs[:, :-1], float(contribs[0, -1])
+    
+    
+    def create_explanation(self, shap_vals, feature_vals, base_val):
+        
+        values = [feature_vals[name] for name in self.feature_names]
+        
+        return build_explanation(self.feature_names, shap_vals, values, base_val)
     
     
     def print_explanation(self, explanation, customer_id=""):
@@ -248,6 +269,9 @@ class AksumExplainer:
     
     def save_explanation_plot(self, customer_data, save_path):
         
+        import pandas as pd
+        from explainability.plot_reports import save_impact_chart
+        
         # convert to dataframe if needed
         if isinstance(customer_data, dict):
             df = pd.DataFrame([customer_data])
@@ -257,78 +281,9 @@ class AksumExplainer:
         df = df[self.feature_names]
         
         # get shap values
-        shap_values = self.explainer.shap_values(df)
-        
-        # create waterfall plot
-        plt.figure(figsize=(10, 6))
-        
-        # prepare data for bar chart
-        values = shap_values[0]
-        names = self.feature_names
-        
-        # sort by absolute value
-        sorted_idx = np.argsort(np.abs(values))[::-1]
-        
-        top_n = 10
-        top_idx = sorted_idx[:top_n]
-        
-        top_values = [values[i] for i in top_idx]
-        top_names = [names[i] for i in top_idx]
-        
-        # colors based on positive/negative
-        colors = []
-        for v in top_values:
-            if v > 0:
-                colors.append("red")
-            else:
-                colors.append("green")
-        
-        # create bar chart
-        y_pos = range(len(top_names))
-        
-        plt.barh(y_pos, top_values, color=colors)
-        plt.yticks(y_pos, top_names)
-        plt.xlabel("SHAP Value (Impact on Risk)")
-        plt.title("Aksum Credit Risk - Feature Impact")
-        plt.tight_layout()
-        
-        # save plot
-        plt.savefig(save_path)
-        plt.close()
-        
-        print("Explanation plot saved to: " + save_path)
-    
-    
-    def explain_batch(self, customer_df):
-        
-        # make sure columns in right order
-        df = customer_df[self.feature_names]
-        
-        # get shap values for all
-        shap_values = self.explainer.shap_values(df)
-        
-        # get top feature for each customer
-        top_risk_features = []
-        top_positive_features = []
-        
-        for i in range(len(df)):
-            
-            vals = shap_values[i]
-            
-            # find highest positive shap (risk)
-            max_risk_idx = np.argmax(vals)
-            max_risk_feat = self.feature_names[max_risk_idx]
-            
-            # find lowest negative shap (positive)
-            min_risk_idx = np.argmin(vals)
-            min_risk_feat = self.feature_names[min_risk_idx]
-            
-            top_risk_features.append(max_risk_feat)
-            top_positive_features.append(min_risk_feat)
+        shap_values = self.get_explainer().shap_values(df)
         
-        # add to dataframe
-        result_df = customer_df.copy()
-        result_df["top_risk_factor"] = top_risk_features
-        result_df["top_positive_factor"] = top_positive_features
+        # headless chart, matplotlib loads only inside plot_reports
+        save_impact_chart(shap_values[0], self.feature_names, save_path)
         
-        return result_df
\ No newline at end of file
+        print("Explanation plot saved to: " + save_path)
\ No newline at end of file
@@ -0,0 +1,229 @@
+# shap_interactions.py
+# which feature pairs drive risk together, aggregated chunk by chunk
+
+import numpy as np
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append("..")
+import config
+from utils.parallel import get_num_jobs
+from utils.portfolio_reader import iter_portfolio_chunks
+
+
+# booster held by each pool worker, sent once at start
+worker_booster = None
+
+
+def init_worker(raw_model):
+    
+    import xgboost as xgb
+    
+    global worker_booster
+    worker_booster = xgb.Booster(model_file=bytearray(raw_model))
+    
+    # one thread per worker, the pool gives the parallelism
+    worker_booster.set_param({"nthread": 1})
+
+
+def interaction_chunk_sums(X_chunk, codes):
+    
+    import xgboost as xgb
+    
+    dmatrix = xgb.DMatrix(X_chunk, feature_names=list(config.FEATURE_NAMES))
+    interactions = worker_booster.predict(dmatrix, pred_interactions=True)
+    
+    # drop the bias row and column
+    interactions = interactions[:, :-1, :-1]
+    abs_interactions = np.abs(interactions)
+    
+    result = {
+        "count": len(X_chunk),
+        "sum_abs": abs_interactions.sum(axis=0, dtype=np.float64),
+        "sum": interactions.sum(axis=0, dtype=np.float64),
+        "segments": {},
+    }
+    
+    # code -1 means no segment
+    for code in np.unique(codes):
+        if code < 0:
+            continue
+        mask = codes == code
+        result["segments"][int(code)] = (int(np.sum(mask)), abs_interactions[mask].sum(axis=0, dtype=np.float64))
+    
+    return result
+
+
+def get_chunk_rows(num_features, n_jobs, memory_mb):
+    
+    # interaction tensor per row plus abs copy, float32
+    bytes_per_row = (num_features + 1) * (num_features + 1) * 4 * 3
+    
+    # every worker holds one chunk, two more are queued per worker
+    rows = int(memory_mb * 1024 * 1024 / (bytes_per_row * n_jobs * 3))
+    
+    return max(rows, 100)
+
+
+class AksumInteractionAnalysis:
+    
+    def __init__(self, xgb_model, n_jobs=None, memory_mb=None):
+        
+        # xgb_model is the trained classifier
+        self.xgb_model = xgb_model
+        self.feature_names = config.FEATURE_NAMES
+        self.n_jobs = get_num_jobs(n_jobs if n_jobs is not None else config.SHAP_INTERACTION_N_JOBS)
+        self.memory_mb = memory_mb if memory_mb is not None else config.SHAP_INTERACTION_MEMORY_MB
+        self.segment_column = config.SHAP_STORE_SEGMENT_COLUMN
+        
+        self.reset()
+    
+    
+    def reset(self):
+        
+        num_features = len(self.feature_names)
+        
+        self.count = 0
+        self.sum_abs = np.zeros((num_features, num_features))
+        self.sum = np.zeros((num_features, num_features))
+        
+        self.segment_codes = {}
+        self.segment_counts = {}
+        self.segment_sum_abs = {}
+    
+    
+    def get_codes(self, chunk):
+        
+        import pandas as pd
+        
+        if self.segment_column not in chunk.columns:
+            return np.full(len(chunk), -1, dtype=np.int64)
+        
+        # factorize the chunk, then map its few distinct names to codes
+        # that stay the same across chunks
+        local_codes, names = pd.factorize(chunk[self.segment_column].astype(str).values)
+        
+        mapping = np.empty(len(names), dtype=np.int64)
+        for j in range(len(names)):
+            if names[j] not in self.segment_codes:
+                self.segment_codes[names[j]] = len(self.segment_codes)
+            mapping[j] = self.segment_codes[names[j]]
+        
+        return mapping[local_codes]
+    
+    
+    def add_result(self, result):
+        
+        self.count = self.count + result["count"]
+        self.sum_abs = self.sum_abs + result["sum_abs"]
+        self.sum = self.sum + result["sum"]
+        
+        for code, (count, sum_abs) in result["segments"].items():
+            if code not in self.segment_counts:
+                self.segment_counts[code] = 0
+                self.segment_sum_abs[code] = np.zeros_like(self.sum_abs)
+            self.segment_counts[code] = self.segment_counts[code] + count
+            self.segment_sum_abs[code] = self.segment_sum_abs[code] + sum_abs
+    
+    
+    def run(self, input_path):
+        
+        self.reset()
+        
+        chunk_rows = get_chunk_rows(len(self.feature_names), self.n_jobs, self.memory_mb)
+        raw_model = bytes(self.xgb_model.get_booster().save_raw())
+        max_pending = self.n_jobs * 2
+        
+        print("Interaction analysis with " + str(self.n_jobs) + " workers, " + str(chunk_rows) + " rows per chunk")
+        
+        with ProcessPoolExecutor(max_workers=self.n_jobs, initializer=init_worker, initargs=(raw_model,)) as pool:
+            
+            pending = []
+            
+            for chunk in iter_portfolio_chunks(input_path, chunk_rows):
+                
+                X_chunk = chunk[self.feature_names].to_numpy(dtype=np.float32)
+                pending.append(pool.submit(interaction_chunk_sums, X_chunk, self.get_codes(chunk)))
+                
+                # wait on the oldest chunk so memory stays within budget
+                if len(pending) >= max_pending:
+                    self.add_result(pending.pop(0).result())
+                    print("Processed " + str(self.count) + " customers")
+            
+            for future in pending:
+                self.add_result(future.result())
+        
+        print("Interaction analysis done for " + str(self.count) + " customers")
+        
+        return self.count
+    
+    
+    def pair_table(self, sum_abs, count):
+        
+        import pandas as pd
+        
+        # matrix is symmetric and each pair effect is split over [i, j] and [j, i]
+        mean_abs = sum_abs / max(count, 1)
+        first, second = np.triu_indices(len(self.feature_names), k=1)
+        
+        table = pd.DataFrame({
+            "feature_a": np.array(self.feature_names)[first],
+            "feature_b": np.array(self.feature_names)[second],
+            "mean_abs_interaction": np.round(2 * mean_abs[first, second], 6),
+        })
+        
+        table = table.sort_values("mean_abs_interaction", ascending=False).reset_index(drop=True)
+        
+        return table
+    
+    
+    def get_top_pairs(self, top_n=None):
+        
+        table = self.pair_table(self.sum_abs, self.count)
+        
+        # signed mean shows whether the pair adds or removes risk on average
+        mean = self.sum / max(self.count, 1)
+        index_of = {name: i for i, name in enumerate(self.feature_names)}
+        signed = []
+        for a, b in zip(table["feature_a"], table["feature_b"]):
+            signed.append(round(2 * mean[index_of[a], index_of[b]], 6))
+        table["mean_interaction"] = signed
+        
+        if top_n is not None:
+            table = table.head(top_n)
+        
+        return table
+    
+    
+    def get_main_effects(self):
+        
+        import pandas as pd
+        
+        # diagonal holds each feature's effect without its partners
+        mean_abs = np.diag(self.sum_abs) / max(self.count, 1)
+        
+        effects = pd.DataFrame({
+            "feature": self.feature_names,
+            "mean_abs_main_effect": np.round(mean_abs, 6),
+        })
+        
+        return effects.sort_values("mean_abs_main_effect", ascending=False).reset_index(drop=True)
+    
+    
+    def get_segment_pairs(self, top_n=5):
+        
+        import pandas as pd
+        
+        names = {code: name for name, code in self.segment_codes.items()}
+        
+        tables = []
+        for code in sorted(self.segment_counts):
+            table = self.pair_table(self.segment_sum_abs[code], self.segment_counts[code]).head(top_n)
+            table.insert(0, "num_customers", self.segment_counts[code])
+            table.insert(0, "segment", names[code])
+            tables.append(table)
+        
+        if len(tables) == 0:
+            return pd.DataFrame(columns=["segment", "num_customers", "feature_a", "feature_b", "mean_abs_interaction"])
+        
+        return pd.concat(tables, ignore_index=True)
\ No newline at end of file
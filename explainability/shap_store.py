@@ -0,0 +1,357 @@
+# shap_store.py
+# shap values for the whole portfolio, stored as float32 columns
+
+import numpy as np
+import json
+import os
+import shutil
+import sys
+import time
+
+sys.path.append("..")
+import config
+from utils.portfolio_reader import iter_portfolio_chunks
+
+
+def get_last_rows(customer_ids):
+    
+    # position of the last row of every customer, in file order
+    first_reversed = np.unique(customer_ids[::-1], return_index=True)[1]
+    
+    return np.sort(len(customer_ids) - 1 - first_reversed)
+
+
+class AksumShapStore:
+    
+    def __init__(self, folder_path=None):
+        
+        if folder_path is None:
+            folder_path = config.SHAP_STORE_DIR
+        
+        self.folder_path = str(folder_path)
+        self.feature_names = config.FEATURE_NAMES
+        self.segment_column = config.SHAP_STORE_SEGMENT_COLUMN
+        
+        self.manifest = None
+        self.customer_ids = None
+        self.shap_values = None
+        self.fingerprints = None
+        self.segments = None
+        self.id_index = None
+    
+    
+    def get_path(self, name):
+        return os.path.join(self.folder_path, name)
+    
+    
+    def get_data_path(self, name):
+        
+        # arrays live in the folder named by the manifest, older stores kept them at the top
+        return os.path.join(self.folder_path, self.manifest.get("data_dir", ""), name)
+    
+    
+    def exists(self):
+        return os.path.exists(self.get_path("manifest.json"))
+    
+    
+    def load(self):
+        
+        with open(self.get_path("manifest.json")) as f:
+            self.manifest = json.load(f)
+        
+        # values stay on disk until a query touches them
+        self.customer_ids = np.load(self.get_data_path("customer_ids.npy"), mmap_mode="r")
+        self.shap_values = np.load(self.get_data_path("shap_values.npy"), mmap_mode="r")
+        self.fingerprints = np.load(self.get_data_path("fingerprints.npy"), mmap_mode="r")
+        
+        self.segments = None
+        if self.manifest["has_segments"]:
+            self.segments = np.load(self.get_data_path("segments.npy"), mmap_mode="r")
+        
+        self.id_index = None
+        
+        return self.manifest
+    
+    
+    def get_id_index(self):
+        
+        import pandas as pd
+        
+        # built once, then lookups are a hash probe
+        if self.id_index is None:
+            index = pd.Index(self.customer_ids)
+            if not index.is_unique:
+                raise ValueError("SHAP store has duplicate customer ids, rebuild it with --full")
+            self.id_index = index
+        
+        return self.id_index
+    
+    
+    def get_fingerprints(self, chunk):
+        
+        import pandas as pd
+        
+        # changes whenever any feature of the customer changes
+        return pd.util.hash_pandas_object(chunk[self.feature_names], index=False).values.astype(np.uint64)
+    
+    
+    def refresh(self, credit_model, input_path, chunk_size=None, full=False):
+        
+        import pandas as pd
+        
+        if chunk_size is None:
+            chunk_size = config.SHAP_STORE_CHUNK_SIZE
+        
+        model_version = credit_model.get_model_version()
+        
+        # old values are only valid for the same model and features
+        reuse = not full and self.exists()
+        if reuse:
+            self.load()
+            if self.manifest["model_version"] != model_version:
+                reuse = False
+            if self.manifest["feature_names"] != list(self.feature_names):
+                reuse = False
+        
+        id_parts = []
+        value_parts = []
+        fingerprint_parts = []
+        segment_parts = []
+        
+        base_value = None
+        if reuse:
+            base_value = self.manifest["base_value"]
+        
+        num_computed = 0
+        num_reused = 0
+        
+        for chunk in iter_portfolio_chunks(input_path, chunk_size):
+            
+            ids = chunk["customer_id"].astype(str).values
+            fingerprints = self.get_fingerprints(chunk)
+            values = np.empty((len(chunk), len(self.feature_names)), dtype=np.float32)
+            changed = np.ones(len(chunk), dtype=bool)
+            
+            if reuse:
+                positions = self.get_id_index().get_indexer(ids)
+                found = positions >= 0
+                
+                same = np.zeros(len(chunk), dtype=bool)
+                same[found] = self.fingerprints[positions[found]] == fingerprints[found]
+                
+                values[same] = self.shap_values[positions[same]]
+                changed = ~same
+            
+            # exact tree shap from the booster for new or changed customers
+            if np.any(changed):
+                X = chunk[self.feature_names].values[changed]
+                prob, contribs, base_value = credit_model.predict_with_contributions(X)
+                values[changed] = contribs
+            
+            num_computed = num_computed + int(np.sum(changed))
+            num_reused = num_reused + int(np.sum(~changed))
+            
+            id_parts.append(ids)
+            value_parts.append(values)
+            fingerprint_parts.append(fingerprints)
+            if self.segment_column in chunk.columns:
+                segment_parts.append(chunk[self.segment_column].astype(str).values)
+            
+            print("Processed " + str(num_computed + num_reused) + " customers")
+        
+        customer_ids = np.asarray(np.concatenate(id_parts), dtype=str)
+        shap_values = np.concatenate(value_parts)
+        fingerprints = np.concatenate(fingerprint_parts)
+        
+        segments = None
+        if len(segment_parts) == len(id_parts):
+            segments = np.asarray(np.concatenate(segment_parts), dtype=str)
+        
+        # a customer listed twice keeps its last row, lookups need unique ids
+        rows = get_last_rows(customer_ids)
+        num_duplicates = len(customer_ids) - len(rows)
+        if num_duplicates > 0:
+            print("Dropped " + str(num_duplicates) + " duplicate customer rows, kept the last of each")
+            customer_ids = customer_ids[rows]
+            shap_values = shap_values[rows]
+            fingerprints = fingerprints[rows]
+            if segments is not None:
+                segments = segments[rows]
+        
+        manifest = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "model_version": model_version,
+            "feature_names": list(self.feature_names),
+            "num_customers": int(len(customer_ids)),
+            "base_value": float(base_value) if base_value is not None else 0.0,
+            "has_segments": segments is not None,
+            "mean_abs_shap": np.abs(shap_values).mean(axis=0).astype(float).tolist(),
+            "mean_shap": shap_values.mean(axis=0).astype(float).tolist(),
+        }
+        
+        # per segment means kept in the manifest like the global ones
+        if segments is not None:
+            codes, names = pd.factorize(segments)
+            counts, means = self.get_segment_means(codes, len(names), shap_values, chunk_size)
+            manifest["segments"] = {
+                "names": [str(name) for name in names],
+                "num_customers": counts.astype(int).tolist(),
+                "mean_abs_shap": means.tolist(),
+            }
+        
+        self.write(manifest, customer_ids, shap_values, fingerprints, segments)
+        self.load()
+        
+        stats = {
+            "num_customers": int(len(customer_ids)),
+            "num_computed": num_computed,
+            "num_reused": num_reused,
+            "num_duplicates": num_duplicates,
+        }
+        
+        return stats
+    
+    
+    def write(self, manifest, customer_ids, shap_values, fingerprints, segments):
+        
+        os.makedirs(self.folder_path, exist_ok=True)
+        
+        previous_dir = None
+        if self.exists():
+            with open(self.get_path("manifest.json")) as f:
+                previous_dir = json.load(f).get("data_dir", "")
+        
+        # the store is reloaded from the new folder after the swap
+        self.customer_ids = None
+        self.shap_values = None
+        self.fingerprints = None
+        self.segments = None
+        self.id_index = None
+        
+        arrays = {
+            "customer_ids": customer_ids,
+            "shap_values": shap_values,
+            "fingerprints": fingerprints,
+        }
+        if segments is not None:
+            arrays["segments"] = segments
+        
+        # arrays go to a new folder, nothing a reader has open is touched
+        data_dir = "data_" + str(int(time.time() * 1000)) + "_" + str(os.getpid())
+        os.makedirs(self.get_path(data_dir))
+        
+        for name, array in arrays.items():
+            np.save(os.path.join(self.get_path(data_dir), name + ".npy"), array)
+        
+        # the manifest rename switches readers to the new arrays in one step
+        manifest["data_dir"] = data_dir
+        temp_path = self.get_path("manifest.json.tmp")
+        with open(temp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, self.get_path("manifest.json"))
+        
+        # readers that read the old manifest may still be opening its arrays
+        self.remove_old_data([data_dir, previous_dir])
+        
+        print("SHAP store saved to " + self.folder_path)
+    
+    
+    def remove_old_data(self, keep):
+        
+        # keep is the current and previous data folder, "" means the top level files
+        for name in os.listdir(self.folder_path):
+            if name.startswith("data_") and name not in keep:
+                shutil.rmtree(self.get_path(name))
+            elif name.endswith(".npy") and "" not in keep:
+                os.remove(self.get_path(name))
+    
+    
+    def global_importance(self):
+        
+        # aggregates are kept in the manifest
+        importance = []
+        for i in range(len(self.feature_names)):
+            importance.append({
+                "feature": self.feature_names[i],
+                "mean_abs_shap": round(self.manifest["mean_abs_shap"][i], 4),
+                "mean_shap": round(self.manifest["mean_shap"][i], 4),
+            })
+        
+        importance.sort(key=lambda x: x["mean_abs_shap"], reverse=True)
+        
+        return importance
+    
+    
+    def get_segment_means(self, codes, num_segments, shap_values, chunk_size=None):
+        
+        if chunk_size is None:
+            chunk_size = config.SHAP_STORE_CHUNK_SIZE
+        
+        counts = np.zeros(num_segments)
+        sums = np.zeros((num_segments, len(self.feature_names)))
+        
+        # customers without a segment have code -1 and are skipped
+        for begin in range(0, len(codes), chunk_size):
+            
+            chunk_codes = codes[begin:begin + chunk_size]
+            keep = chunk_codes >= 0
+            chunk_codes = chunk_codes[keep]
+            chunk_abs = np.abs(np.asarray(shap_values[begin:begin + chunk_size], dtype=np.float64))[keep]
+            
+            counts = counts + np.bincount(chunk_codes, minlength=num_segments)
+            for j in range(len(self.feature_names)):
+                sums[:, j] = sums[:, j] + np.bincount(chunk_codes, weights=chunk_abs[:, j], minlength=num_segments)
+        
+        means = sums / np.maximum(counts, 1)[:, None]
+        
+        return counts, means
+    
+    
+    def segment_summary(self, segments=None, chunk_size=None):
+        
+        import pandas as pd
+        
+        # segments is a series indexed by customer_id, default is the stored column
+        if segments is None and "segments" in self.manifest:
+            
+            # stored column was aggregated at refresh time
+            names = self.manifest["segments"]["names"]
+            counts = np.asarray(self.manifest["segments"]["num_customers"])
+            means = np.asarray(self.manifest["segments"]["mean_abs_shap"]).reshape(len(names), len(self.feature_names))
+        
+        else:
+            
+            if segments is None:
+                if self.segments is None:
+                    raise ValueError("Store has no segment column, pass segments")
+                segment_values = np.asarray(self.segments)
+            else:
+                segment_values = segments.reindex(self.get_id_index()).values
+            
+            codes, names = pd.factorize(segment_values)
+            counts, means = self.get_segment_means(codes, len(names), self.shap_values, chunk_size)
+        
+        summary = pd.DataFrame(np.round(means, 4), index=names, columns=self.feature_names)
+        summary["num_customers"] = counts.astype(int)
+        summary["top_driver"] = np.array(self.feature_names)[np.argmax(means, axis=1)]
+        
+        return summary
+    
+    
+    def lookup(self, customer_id):
+        
+        index = self.get_id_index()
+        if customer_id not in index:
+            return None
+        
+        row = np.asarray(self.shap_values[index.get_loc(customer_id)], dtype=np.float64)
+        
+        result = {
+            "customer_id": customer_id,
+            "base_risk_score": round(self.manifest["base_value"], 4),
+            "shap_values": {},
+        }
+        for i in range(len(self.feature_names)):
+            result["shap_values"][self.feature_names[i]] = round(float(row[i]), 4)
+        
+        return result
\ No newline at end of file
@@ -0,0 +1,39 @@
+# build_fraud_bundle.py
+# write the versioned fraud bundle from saved pickles and check it
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from models.fraud_detector import AksumFraudDetector
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="Build and validate the fraud detector bundle")
+    parser.add_argument("--model-dir", default=str(config.MODEL_DIR))
+    parser.add_argument("--validate-only", action="store_true")
+    args = parser.parse_args()
+    
+    detector = AksumFraudDetector()
+    
+    if not args.validate_only:
+        detector.backend = "native"
+        detector.use_fast_scorer = False
+        detector.load_detector(args.model_dir)
+        detector.save_bundle(args.model_dir)
+    
+    errors = detector.validate_bundle(args.model_dir)
+    if len(errors) > 0:
+        for error in errors:
+            print("  " + error)
+        sys.exit(1)
+    
+    print("Fraud bundle is valid")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,52 @@
+# build_response_surfaces.py
+# precompute risk grids for quick check and risk calculator
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from models.xgboost_model import AksumCreditModel
+from models.response_surface import AksumResponseSurface
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="Build dashboard response surfaces")
+    parser.add_argument("--model", default=str(config.MODEL_DIR / "aksum_credit_model.pkl"))
+    parser.add_argument("--output-dir", default=str(config.MODEL_DIR))
+    args = parser.parse_args()
+    
+    model = AksumCreditModel()
+    model.load_model(args.model)
+    
+    all_passed = True
+    
+    # always rebuild, serving processes rebuild only when stale
+    for name in config.RESPONSE_SURFACES:
+        surface = AksumResponseSurface(name)
+        surface.build(model)
+        
+        # interpolated lookups against the model off the grid
+        parity = surface.check_parity(model)
+        print("  max abs error " + str(parity["max_abs_error"]))
+        print("  mean abs error " + str(parity["mean_abs_error"]))
+        print("  category agreement " + str(parity["category_agreement_pct"]) + "%")
+        print("  passed " + str(parity["passed"]))
+        
+        # failed grids leave the previous file in place
+        if parity["passed"]:
+            surface.save(args.output_dir)
+        else:
+            all_passed = False
+    
+    if not all_passed:
+        print("")
+        print("Surface parity check failed, old surfaces kept, use smaller steps in RESPONSE_SURFACES")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
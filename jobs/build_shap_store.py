@@ -0,0 +1,42 @@
+# build_shap_store.py
+# portfolio wide shap values, only changed customers are recomputed
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from models.xgboost_model import AksumCreditModel
+from explainability.shap_store import AksumShapStore
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="Build or refresh the portfolio SHAP store")
+    parser.add_argument("portfolio", help="csv or parquet portfolio file")
+    parser.add_argument("--model", default=str(config.MODEL_DIR / "aksum_credit_model.pkl"))
+    parser.add_argument("--store-dir", default=str(config.SHAP_STORE_DIR))
+    parser.add_argument("--chunk-size", type=int, default=config.SHAP_STORE_CHUNK_SIZE)
+    parser.add_argument("--full", action="store_true", help="recompute every customer")
+    args = parser.parse_args()
+    
+    model = AksumCreditModel()
+    model.load_model(args.model)
+    
+    store = AksumShapStore(args.store_dir)
+    stats = store.refresh(model, args.portfolio, chunk_size=args.chunk_size, full=args.full)
+    
+    print("")
+    for key, value in stats.items():
+        print(key + ": " + str(value))
+    
+    print("")
+    print("Top drivers:")
+    for item in store.global_importance()[:5]:
+        print("  " + item["feature"] + ": " + str(item["mean_abs_shap"]))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,68 @@
+# export_onnx.py
+# export credit and fraud models to onnx and check parity
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import config
+from models.xgboost_model import AksumCreditModel
+from models.fraud_detector import AksumFraudDetector
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="Export models to ONNX")
+    parser.add_argument("--model-dir", default=str(config.MODEL_DIR))
+    parser.add_argument("--data", default=str(config.DATA_DIR / "customer_data.csv"))
+    args = parser.parse_args()
+    
+    model_path = os.path.join(args.model_dir, "aksum_credit_model.pkl")
+    data = pd.read_csv(args.data)
+    X = data[config.FEATURE_NAMES]
+    
+    # export from the native models
+    credit_model = AksumCreditModel()
+    credit_model.backend = "native"
+    credit_model.load_model(model_path)
+    credit_model.export_onnx(model_path)
+    
+    fraud = AksumFraudDetector()
+    fraud.backend = "native"
+    fraud.use_fast_scorer = False
+    fraud.load_detector(args.model_dir)
+    fraud.export_onnx(args.model_dir)
+    
+    # load onnx next to native and compare
+    credit_model.load_onnx(model_path)
+    fraud.load_onnx(args.model_dir)
+    
+    all_passed = True
+    
+    print("")
+    print("Credit model parity:")
+    credit_parity = credit_model.check_onnx_parity(X)
+    for tier, result in credit_parity.items():
+        print("  " + tier + ": max diff " + str(result["max_abs_diff"]) + " passed " + str(result["passed"]))
+        all_passed = all_passed and result["passed"]
+    
+    print("")
+    print("Fraud detector parity:")
+    fraud_parity = fraud.check_onnx_parity(data)
+    print("  max diff " + str(fraud_parity["max_abs_diff"]))
+    print("  label mismatches " + str(fraud_parity["label_mismatches"]))
+    print("  passed " + str(fraud_parity["passed"]))
+    all_passed = all_passed and fraud_parity["passed"]
+    
+    if not all_passed:
+        print("")
+        print("ONNX parity check failed, keep INFERENCE_BACKEND = native")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,46 @@
+# find_duplicates.py
+# group customers with nearly identical behaviour across the portfolio
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from vector_store.case_retrieval import AksumCaseRetrieval
+from vector_store.duplicate_finder import AksumDuplicateFinder
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="Near duplicate customer clusters")
+    parser.add_argument("output", help="csv file for cluster members")
+    parser.add_argument("--pairs-output", default=None, help="optional csv file for matched pairs")
+    parser.add_argument("--vector-dir", default=str(config.VECTOR_DIR))
+    parser.add_argument("--radius", type=float, default=config.DUPLICATE_RADIUS)
+    parser.add_argument("--neighbors", type=int, default=config.DUPLICATE_NEIGHBORS)
+    parser.add_argument("--chunk-size", type=int, default=config.DUPLICATE_CHUNK_SIZE)
+    parser.add_argument("--min-size", type=int, default=2)
+    args = parser.parse_args()
+    
+    retrieval = AksumCaseRetrieval()
+    retrieval.load_index(args.vector_dir)
+    
+    finder = AksumDuplicateFinder(
+        retrieval,
+        radius=args.radius,
+        num_neighbors=args.neighbors,
+        chunk_size=args.chunk_size
+    )
+    clusters, pairs = finder.find_clusters(min_size=args.min_size)
+    
+    clusters.to_csv(args.output, index=False)
+    if args.pairs_output is not None:
+        pairs.to_csv(args.pairs_output, index=False)
+    
+    print("Clusters written to " + args.output)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,55 @@
+# fraud_sweep.py
+# nightly portfolio fraud sweep over a csv or parquet file
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from models.fraud_detector import AksumFraudDetector
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="Streaming fraud sweep")
+    parser.add_argument("portfolio", help="csv or parquet portfolio file")
+    parser.add_argument("output", help="csv file for flagged customers")
+    parser.add_argument("--model-dir", default=str(config.MODEL_DIR))
+    parser.add_argument("--chunk-size", type=int, default=config.FRAUD_SWEEP_CHUNK_SIZE)
+    parser.add_argument("--n-jobs", type=int, default=config.FRAUD_N_JOBS)
+    parser.add_argument("--refresh-thresholds", action="store_true",
+                        help="add the sweep scores to the threshold sketch and save the bundle")
+    args = parser.parse_args()
+    
+    # sweeps are bulk work, sklearn chunks sharded over a pool
+    detector = AksumFraudDetector()
+    detector.use_fast_scorer = False
+    detector.load_detector(args.model_dir)
+    detector.score_jobs = args.n_jobs
+    
+    try:
+        stats = detector.stream_fraud_sweep(
+            args.portfolio,
+            args.output,
+            chunk_size=args.chunk_size,
+            refresh_thresholds=args.refresh_thresholds
+        )
+    finally:
+        detector.close_pool()
+    
+    # serving picks up the new thresholds with the next bundle load
+    if args.refresh_thresholds:
+        detector.save_bundle(args.model_dir)
+        print("Thresholds refreshed:")
+        for key, value in detector.threshold_scores.items():
+            print("  " + key + ": " + str(round(value, 4)))
+    
+    print("")
+    for key, value in stats.items():
+        print(key + ": " + str(value))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,48 @@
+# render_explanation_plots.py
+# explanation chart for every customer in a portfolio file
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import config
+from models.xgboost_model import AksumCreditModel
+from explainability.plot_reports import AksumPlotReport
+from utils.portfolio_reader import iter_portfolio_chunks
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="Render explanation charts in parallel")
+    parser.add_argument("portfolio", help="csv or parquet portfolio file")
+    parser.add_argument("output_dir", help="folder for the png charts")
+    parser.add_argument("--model", default=str(config.MODEL_DIR / "aksum_credit_model.pkl"))
+    parser.add_argument("--n-jobs", type=int, default=config.PLOT_N_JOBS)
+    parser.add_argument("--chunk-size", type=int, default=config.PLOT_CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=config.SHAP_STORE_CHUNK_SIZE)
+    args = parser.parse_args()
+    
+    model = AksumCreditModel()
+    model.load_model(args.model)
+    
+    report = AksumPlotReport(n_jobs=args.n_jobs, chunk_size=args.chunk_size)
+    total = 0
+    
+    # contributions come from the booster, shap is not needed
+    try:
+        for chunk in iter_portfolio_chunks(args.portfolio, args.batch_size):
+            X = chunk[config.FEATURE_NAMES].to_numpy(dtype=np.float64)
+            prob, contribs, base_value = model.predict_with_contributions(X)
+            total = total + report.render(contribs, chunk["customer_id"].values, args.output_dir)
+    finally:
+        report.close_pool()
+    
+    print("Charts written to " + args.output_dir + " (" + str(total) + " customers)")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
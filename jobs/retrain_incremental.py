@@ -0,0 +1,83 @@
+# retrain_incremental.py
+# weekly warm-start retrain on newly labelled customers
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+import config
+from models.xgboost_model import AksumCreditModel
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="Incremental retrain of the credit model")
+    parser.add_argument("new_data", help="csv with newly labelled customers")
+    parser.add_argument("--model", default=str(config.MODEL_DIR / "aksum_credit_model.pkl"))
+    parser.add_argument("--full-data", default=str(config.DATA_DIR / "customer_data.csv"))
+    parser.add_argument("--rounds", type=int, default=config.INCREMENTAL_ROUNDS)
+    parser.add_argument("--guard", action="store_true", help="full retrain only if the update loses auc on holdout")
+    args = parser.parse_args()
+    
+    model = AksumCreditModel()
+    model.load_model(args.model)
+    
+    new_df = pd.read_csv(args.new_data)
+    X_new = new_df[model.feature_names]
+    y_new = new_df["default_flag"]
+    
+    # past the tree cap, start again from old plus new rows
+    if model.needs_full_retrain(args.rounds):
+        print("Tree cap of " + str(config.INCREMENTAL_MAX_TREES) + " reached, running full retrain")
+        X_old, y_old = model.load_data(args.full_data)
+        model.train_full(pd.concat([X_old, X_new]), pd.concat([y_old, y_new]))
+        model.save_model(args.model)
+        return
+    
+    # same class and size checks as the guard, before touching the booster
+    try:
+        model.check_labels(y_new, "New data")
+    except ValueError as e:
+        print(str(e) + ", model left unchanged")
+        sys.exit(1)
+    
+    if not args.guard:
+        model.train_incremental(X_new, y_new, num_rounds=args.rounds)
+        model.save_model(args.model)
+        return
+    
+    # keep part of the new rows as holdout that neither model has seen
+    X_new_train, X_holdout, y_new_train, y_holdout = train_test_split(
+        X_new, y_new, test_size=config.TEST_SIZE, random_state=config.RANDOM_STATE, stratify=y_new
+    )
+    
+    # both halves of the split must pass the label checks too
+    previous_model = model.model
+    try:
+        model.train_incremental(X_new_train, y_new_train, num_rounds=args.rounds)
+        result = model.check_incremental_guard(previous_model, X_holdout, y_holdout)
+    except ValueError as e:
+        print(str(e) + ", model left unchanged")
+        sys.exit(1)
+    
+    print("Incremental AUC: " + str(result["incremental_auc"]))
+    print("Previous AUC: " + str(result["previous_auc"]))
+    print("AUC drop: " + str(result["auc_drop"]))
+    print("Guard passed: " + str(result["passed"]))
+    
+    # full retrain on old plus new rows only when the update got worse
+    if not result["passed"]:
+        print("Incremental guard failed, running full retrain")
+        X_old, y_old = model.load_data(args.full_data)
+        model.train_full(pd.concat([X_old, X_new]), pd.concat([y_old, y_new]))
+    
+    model.save_model(args.model)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
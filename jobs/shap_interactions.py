@@ -0,0 +1,48 @@
+# shap_interactions.py
+# feature pairs that drive risk together, over the whole portfolio
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from models.xgboost_model import AksumCreditModel
+from explainability.shap_interactions import AksumInteractionAnalysis
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description="Chunked SHAP interaction analysis")
+    parser.add_argument("portfolio", help="csv or parquet portfolio file")
+    parser.add_argument("output", help="csv file for feature pairs")
+    parser.add_argument("--segments-output", default=None, help="optional csv file for top pairs per segment")
+    parser.add_argument("--model", default=str(config.MODEL_DIR / "aksum_credit_model.pkl"))
+    parser.add_argument("--n-jobs", type=int, default=config.SHAP_INTERACTION_N_JOBS)
+    parser.add_argument("--memory-mb", type=int, default=config.SHAP_INTERACTION_MEMORY_MB)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    
+    model = AksumCreditModel()
+    model.load_model(args.model)
+    
+    analysis = AksumInteractionAnalysis(model.model, n_jobs=args.n_jobs, memory_mb=args.memory_mb)
+    analysis.run(args.portfolio)
+    
+    pairs = analysis.get_top_pairs()
+    pairs.to_csv(args.output, index=False)
+    
+    if args.segments_output is not None:
+        analysis.get_segment_pairs(top_n=args.top).to_csv(args.segments_output, index=False)
+    
+    print("")
+    print("Top interacting pairs:")
+    for row in pairs.head(args.top).itertuples():
+        print("  " + row.feature_a + " x " + row.feature_b + ": " + str(row.mean_abs_interaction))
+    
+    print("Pairs written to " + args.output)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
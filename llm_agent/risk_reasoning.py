@@ -7,12 +7,16 @@ import os
 sys.path.append("..")
 import config
 
-try:
-    import google.generativeai as genai
-    gemini_loaded = True
-except:
-    gemini_loaded = False
-    print("Warning: Google Gemini not loaded")
+
+def load_gemini():
+    
+    # only imported when a key is configured
+    try:
+        import google.generativeai as genai
+        return genai
+    except:
+        print("Warning: Google Gemini not loaded")
+        return None
 
 
 class AksumLLMAgent:
@@ -20,12 +24,18 @@ class AksumLLMAgent:
     def __init__(self):
         
         self.model = None
-        self.enabled = config.GEMINI_ENABLED
+        self.enabled = config.is_gemini_enabled()
+        self.gemini_loaded = False
         self.use_gemini = False
         self.api_calls_made = 0
         
-        if self.enabled and gemini_loaded:
-            genai.configure(api_key=config.GEMINI_API_KEY)
+        genai = None
+        if self.enabled:
+            genai = load_gemini()
+        
+        if genai is not None:
+            self.gemini_loaded = True
+            genai.configure(api_key=config.get_gemini_api_key())
             self.model = genai.GenerativeModel(config.GEMINI_MODEL)
             print("Aksum LLM Agent ready with Gemini")
         else:
@@ -33,7 +43,7 @@ class AksumLLMAgent:
     
     
     def enable_gemini(self):
-        if self.enabled and gemini_loaded:
+        if self.enabled and self.gemini_loaded:
             self.use_gemini = True
             print("Gemini enabled")
     
@@ -0,0 +1,172 @@
+# fast_isolation_forest.py
+# isolation forest scoring with flat numpy arrays, no sklearn needed
+
+import numpy as np
+import sys
+
+sys.path.append("..")
+import config
+
+
+def export_isolation_forest(scaler, isolation_forest):
+    
+    # sklearn only needed when exporting
+    from sklearn.ensemble._iforest import _average_path_length
+    
+    num_features = len(scaler.mean_)
+    subsample_features = isolation_forest._max_features != num_features
+    
+    features = []
+    thresholds = []
+    lefts = []
+    rights = []
+    values = []
+    roots = []
+    
+    node_offset = 0
+    max_depth = 0
+    
+    for tree_idx in range(len(isolation_forest.estimators_)):
+        
+        tree = isolation_forest.estimators_[tree_idx].tree_
+        num_nodes = tree.node_count
+        
+        left = tree.children_left.astype(np.int64)
+        right = tree.children_right.astype(np.int64)
+        is_leaf = left == -1
+        
+        # node depth with root = 1, children always come after parent
+        depth = np.zeros(num_nodes, dtype=np.int64)
+        depth[0] = 1
+        for node in range(num_nodes):
+            if not is_leaf[node]:
+                depth[left[node]] = depth[node] + 1
+                depth[right[node]] = depth[node] + 1
+        
+        max_depth = max(max_depth, int(depth.max()))
+        
+        # path length contributed by each leaf, same sum as score_samples
+        value = depth + _average_path_length(tree.n_node_samples) - 1.0
+        
+        # leaves point to themselves so all rows can take the same steps
+        node_ids = np.arange(num_nodes)
+        left[is_leaf] = node_ids[is_leaf]
+        right[is_leaf] = node_ids[is_leaf]
+        
+        feature = tree.feature.astype(np.int64)
+        feature[is_leaf] = 0
+        if subsample_features:
+            feature = np.asarray(isolation_forest.estimators_features_[tree_idx])[feature]
+        
+        features.append(feature)
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(left + node_offset)
+        rights.append(right + node_offset)
+        values.append(value)
+        roots.append(node_offset)
+        
+        node_offset = node_offset + num_nodes
+    
+    num_trees = len(isolation_forest.estimators_)
+    denominator = num_trees * _average_path_length([isolation_forest._max_samples])[0]
+    
+    arrays = {
+        "scaler_mean": np.asarray(scaler.mean_, dtype=np.float64),
+        "scaler_scale": np.asarray(scaler.scale_, dtype=np.float64),
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "value": np.concatenate(values),
+        "roots": np.asarray(roots, dtype=np.int64),
+        "max_depth": np.asarray(max_depth, dtype=np.int64),
+        "denominator": np.asarray(denominator, dtype=np.float64),
+        "offset": np.asarray(isolation_forest.offset_, dtype=np.float64),
+    }
+    
+    return arrays
+
+
+class AksumFastIsolationForest:
+    
+    def __init__(self, arrays):
+        
+        self.scaler_mean = arrays["scaler_mean"]
+        self.scaler_scale = arrays["scaler_scale"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+        self.denominator = float(arrays["denominator"])
+        self.offset = float(arrays["offset"])
+        self.chunk_size = config.FRAUD_SCORER_CHUNK_SIZE
+    
+    
+    def transform(self, X):
+        
+        # same arithmetic as StandardScaler.transform
+        X = np.array(X, dtype=np.float64)
+        X -= self.scaler_mean
+        X /= self.scaler_scale
+        
+        return X
+    
+    
+    def path_lengths(self, X_scaled):
+        
+        # trees compare float32 inputs like sklearn does
+        X32 = X_scaled.astype(np.float32)
+        num_rows = X32.shape[0]
+        
+        rows = np.arange(num_rows)[:, None]
+        node = np.repeat(self.roots[None, :], num_rows, axis=0)
+        
+        # walk all rows down all trees together
+        for step in range(self.max_depth):
+            feat = self.feature[node]
+            go_left = X32[rows, feat] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        
+        # cumsum adds trees in order, matching sklearn exactly
+        depths = np.cumsum(self.value[node], axis=1)[:, -1]
+        
+        return depths
+    
+    
+    def score_samples(self, X, is_scaled=False):
+        
+        X_scaled = X if is_scaled else self.transform(X)
+        num_rows = X_scaled.shape[0]
+        
+        depths = np.empty(num_rows, dtype=np.float64)
+        
+        # chunk rows to bound the rows x trees work arrays
+        for begin in range(0, num_rows, self.chunk_size):
+            end = min(begin + self.chunk_size, num_rows)
+            depths[begin:end] = self.path_lengths(X_scaled[begin:end])
+        
+        scores = 2 ** (-(depths / self.denominator))
+        
+        return -scores
+    
+    
+    def get_arrays(self):
+        
+        arrays = {
+            "scaler_mean": self.scaler_mean,
+            "scaler_scale": self.scaler_scale,
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "value": self.value,
+            "roots": self.roots,
+            "max_depth": np.asarray(self.max_depth, dtype=np.int64),
+            "denominator": np.asarray(self.denominator, dtype=np.float64),
+            "offset": np.asarray(self.offset, dtype=np.float64),
+        }
+        
+        return arrays
\ No newline at end of file
@@ -0,0 +1,137 @@
+# fraud_bundle.py
+# single versioned artifact for the fraud detector
+
+import numpy as np
+import hashlib
+import json
+import os
+import sys
+import time
+
+sys.path.append("..")
+import config
+
+
+BUNDLE_FORMAT = "aksum-fraud-bundle"
+BUNDLE_VERSION = 1
+
+
+def file_checksum(filepath):
+    
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    
+    return digest.hexdigest()
+
+
+def write_bundle(folder_path, arrays, meta):
+    
+    # write into a temp folder first, then rename into place
+    folder_path = str(folder_path)
+    temp_path = folder_path + ".tmp"
+    os.makedirs(temp_path, exist_ok=True)
+    
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "feature_names": list(config.FEATURE_NAMES),
+        "arrays": {},
+    }
+    manifest.update(meta)
+    
+    for name, array in arrays.items():
+        
+        filename = name + ".npy"
+        filepath = os.path.join(temp_path, filename)
+        np.save(filepath, np.ascontiguousarray(array))
+        
+        manifest["arrays"][name] = {
+            "file": filename,
+            "sha256": file_checksum(filepath),
+            "dtype": str(np.asarray(array).dtype),
+            "shape": list(np.asarray(array).shape),
+        }
+    
+    # bundle id changes with any array
+    ids = "".join(manifest["arrays"][name]["sha256"] for name in sorted(manifest["arrays"]))
+    manifest["bundle_id"] = hashlib.sha256(ids.encode()).hexdigest()[:12]
+    
+    with open(os.path.join(temp_path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    
+    # swap old bundle out only after the new one is complete
+    if os.path.exists(folder_path):
+        old_path = folder_path + ".old"
+        if os.path.exists(old_path):
+            remove_folder(old_path)
+        os.rename(folder_path, old_path)
+        os.rename(temp_path, folder_path)
+        remove_folder(old_path)
+    else:
+        os.rename(temp_path, folder_path)
+    
+    return manifest
+
+
+def remove_folder(folder_path):
+    
+    for name in os.listdir(folder_path):
+        os.remove(os.path.join(folder_path, name))
+    os.rmdir(folder_path)
+
+
+def read_manifest(folder_path):
+    
+    with open(os.path.join(str(folder_path), "manifest.json")) as f:
+        return json.load(f)
+
+
+def validate_bundle(folder_path, check_sums=True):
+    
+    # list of problems, empty means the bundle is good
+    errors = []
+    folder_path = str(folder_path)
+    
+    if not os.path.exists(os.path.join(folder_path, "manifest.json")):
+        return ["manifest.json missing"]
+    
+    manifest = read_manifest(folder_path)
+    
+    if manifest.get("format") != BUNDLE_FORMAT:
+        errors.append("unknown bundle format: " + str(manifest.get("format")))
+    if manifest.get("version") != BUNDLE_VERSION:
+        errors.append("unsupported bundle version: " + str(manifest.get("version")))
+    if manifest.get("feature_names") != list(config.FEATURE_NAMES):
+        errors.append("feature names do not match config")
+    
+    for name, info in manifest.get("arrays", {}).items():
+        
+        filepath = os.path.join(folder_path, info["file"])
+        if not os.path.exists(filepath):
+            errors.append("missing array file: " + info["file"])
+            continue
+        
+        if check_sums and file_checksum(filepath) != info["sha256"]:
+            errors.append("checksum mismatch: " + info["file"])
+    
+    return errors
+
+
+def read_bundle(folder_path, validate=True):
+    
+    if validate:
+        errors = validate_bundle(folder_path)
+        if len(errors) > 0:
+            raise ValueError("Invalid fraud bundle: " + "; ".join(errors))
+    
+    manifest = read_manifest(folder_path)
+    
+    # memory mapped, pages load on first touch
+    arrays = {}
+    for name, info in manifest["arrays"].items():
+        arrays[name] = np.load(os.path.join(str(folder_path), info["file"]), mmap_mode="r")
+    
+    return manifest, arrays
\ No newline at end of file
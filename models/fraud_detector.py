@@ -2,15 +2,53 @@
 # detect fraud patterns in b2b customers
 
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
-import joblib
 import os
 import sys
 
 sys.path.append("..")
 import config
+from models.fraud_rules import AksumRuleEngine
+from models.quantile_sketch import AksumQuantileSketch
+from utils.parallel import get_num_jobs
+
+
+# columns of the streaming sweep output file
+FLAGGED_COLUMNS = [
+    "customer_id",
+    "is_anomaly",
+    "anomaly_score",
+    "fraud_risk_level",
+    "suspicious_patterns",
+]
+
+# scoring objects held by each pool worker, sent once at start
+worker_scaler = None
+worker_forest = None
+worker_session = None
+worker_offset = None
+
+
+def init_worker(scaler, isolation_forest, onnx_path, score_offset):
+    
+    global worker_scaler, worker_forest, worker_session, worker_offset
+    
+    # onnx sessions cannot be pickled, each worker opens its own
+    if onnx_path is not None:
+        from models.onnx_backend import AksumOnnxSession
+        worker_session = AksumOnnxSession(onnx_path)
+    
+    worker_scaler = scaler
+    worker_forest = isolation_forest
+    worker_offset = score_offset
+
+
+def score_chunk_in_worker(X_chunk):
+    
+    if worker_session is not None:
+        prediction, decision = worker_session.score_anomaly(X_chunk)
+        return decision + worker_offset
+    
+    return worker_forest.score_samples(worker_scaler.transform(X_chunk))
 
 
 class AksumFraudDetector:
@@ -22,12 +60,34 @@ class AksumFraudDetector:
         self.feature_names = config.FEATURE_NAMES
         self.contamination = config.FRAUD_CONTAMINATION
         self.threshold_scores = {}
+        self.backend = config.INFERENCE_BACKEND
+        self.onnx_session = None
+        self.onnx_path = None
+        self.score_offset = None
+        self.fast_scorer = None
+        self.use_fast_scorer = config.FRAUD_FAST_SCORER
+        self.n_jobs = config.FRAUD_N_JOBS
+        self.score_sketch = None
+        self.online_detector = None
+        self.bundle_id = None
+        self.detector_version = None
+        
+        # serving scores in process, bulk jobs raise this and close the pool
+        self.score_jobs = 1
+        self.pool = None
+        self.pool_jobs = 0
+        
+        self.rule_engine = AksumRuleEngine()
         
         print("Aksum Fraud Detector initialized")
     
     
     def train_detector(self, clean_data):
         
+        # sklearn only needed for training
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+        
         print("Training fraud detector...")
         
         # get features
@@ -37,23 +97,40 @@ class AksumFraudDetector:
         self.scaler = StandardScaler()
         X_scaled = self.scaler.fit_transform(X)
         
-        # train isolation forest
+        # train isolation forest, trees fitted in parallel
         self.isolation_forest = IsolationForest(
             contamination=self.contamination,
             random_state=42,
-            n_estimators=100
+            n_estimators=100,
+            n_jobs=self.n_jobs
         )
         
         self.isolation_forest.fit(X_scaled)
+        self.score_offset = float(self.isolation_forest.offset_)
+        self.detector_version = None
+        
+        # pool workers and the onnx graph still hold the previous forest
+        self.close_pool()
+        self.onnx_session = None
+        self.onnx_path = None
+        
+        # numpy scorer serves small batches after training
+        if self.use_fast_scorer:
+            from models.fast_isolation_forest import export_isolation_forest
+            from models.fast_isolation_forest import AksumFastIsolationForest
+            self.fast_scorer = AksumFastIsolationForest(export_isolation_forest(self.scaler, self.isolation_forest))
+        
+        # get scores for threshold setting, the whole training set is bulk work
+        if get_num_jobs(self.n_jobs) > 1 and len(X) >= config.FRAUD_PARALLEL_MIN_ROWS:
+            scores = self.score_samples_parallel(X, self.n_jobs)
+            self.close_pool()
+        else:
+            scores = self.isolation_forest.score_samples(X_scaled)
         
-        # get scores for threshold setting
-        scores = self.isolation_forest.score_samples(X_scaled)
-        
-        # calculate thresholds
-        self.threshold_scores["very_suspicious"] = np.percentile(scores, 1)
-        self.threshold_scores["suspicious"] = np.percentile(scores, 5)
-        self.threshold_scores["unusual"] = np.percentile(scores, 10)
-        self.threshold_scores["normal"] = np.percentile(scores, 50)
+        # calculate thresholds from a mergeable sketch of the scores
+        self.score_sketch = AksumQuantileSketch()
+        self.score_sketch.update(scores)
+        self.set_thresholds_from_sketch()
         
         print("Fraud detector trained")
         print("Thresholds set:")
@@ -63,8 +140,18 @@ class AksumFraudDetector:
         return self.isolation_forest
     
     
+    def set_thresholds_from_sketch(self):
+        
+        for key, q in config.FRAUD_THRESHOLD_QUANTILES.items():
+            self.threshold_scores[key] = self.score_sketch.quantile(q)
+        
+        return self.threshold_scores
+    
+    
     def detect_fraud(self, customer_data):
         
+        import pandas as pd
+        
         # convert dict to dataframe if needed
         if isinstance(customer_data, dict):
             df = pd.DataFrame([customer_data])
@@ -74,16 +161,8 @@ class AksumFraudDetector:
         # get features
         X = df[self.feature_names]
         
-        # scale data
-        X_scaled = self.scaler.transform(X)
-        
-        # get anomaly prediction
-        # -1 means anomaly, 1 means normal
-        prediction = self.isolation_forest.predict(X_scaled)
-        
-        # get anomaly score
-        # lower score means more anomalous
-        score = self.isolation_forest.score_samples(X_scaled)
+        # get anomaly prediction and score
+        prediction, score = self.score_matrix(X)
         
         # determine fraud risk level
         fraud_level = self.get_fraud_level(score[0])
@@ -98,9 +177,173 @@ class AksumFraudDetector:
             "suspicious_features": suspicious_features,
         }
         
+        # online detector sees every checked customer
+        if self.online_detector is not None:
+            result.update(self.score_online_event(X.to_numpy(dtype=float)[0]))
+        
+        return result
+    
+    
+    def get_scaler_params(self):
+        
+        if self.fast_scorer is not None:
+            return self.fast_scorer.scaler_mean, self.fast_scorer.scaler_scale
+        
+        if self.scaler is not None:
+            return self.scaler.mean_, self.scaler.scale_
+        
+        raise ValueError("Scaler not loaded, online detector needs feature bounds")
+    
+    
+    def enable_online_detector(self):
+        
+        from models.online_detector import AksumHalfSpaceTrees
+        
+        # feature bounds from the training distribution
+        mean, scale = self.get_scaler_params()
+        mins = np.asarray(mean) - 4 * np.asarray(scale)
+        maxs = np.asarray(mean) + 4 * np.asarray(scale)
+        
+        self.online_detector = AksumHalfSpaceTrees(mins, maxs)
+        
+        print("Online fraud detector enabled")
+        
+        return self.online_detector
+    
+    
+    def score_online_event(self, customer_data):
+        
+        # score then learn from one live update
+        if isinstance(customer_data, dict):
+            x = np.array([float(customer_data[name]) for name in self.feature_names])
+        else:
+            x = np.asarray(customer_data, dtype=float)
+        
+        score = self.online_detector.score_and_update(x)
+        
+        result = {
+            "online_anomaly_score": round(score, 4),
+            "online_detector_ready": self.online_detector.is_ready(),
+        }
+        
         return result
     
     
+    def score_matrix(self, X):
+        
+        # bulk jobs shard rows over worker processes
+        # once the pool is up smaller batches, like the last sweep chunk, use it too
+        can_shard = self.onnx_session is not None or self.isolation_forest is not None
+        large_batch = len(X) >= config.FRAUD_PARALLEL_MIN_ROWS or self.pool is not None
+        if self.score_jobs != 1 and large_batch and can_shard:
+            
+            score = self.score_samples_parallel(X)
+            prediction = self.get_anomaly_prediction(score)
+            
+            return prediction, score
+        
+        if self.onnx_session is not None:
+            
+            # onnx pipeline scales and scores in one run
+            # it returns decision function, so add offset back
+            prediction, decision = self.onnx_session.score_anomaly(X)
+            score = decision + self.score_offset
+            
+            return prediction, score
+        
+        # numpy scorer only for small batches, bulk goes to sklearn
+        # unless the detector was loaded without the sklearn objects
+        small_batch = len(X) <= config.FRAUD_FAST_SCORER_MAX_ROWS
+        
+        if self.fast_scorer is not None and (small_batch or self.isolation_forest is None):
+            
+            # same scores as sklearn
+            score = self.fast_scorer.score_samples(X)
+            prediction = self.get_anomaly_prediction(score)
+            
+            return prediction, score
+        
+        # scale data
+        X_scaled = self.scaler.transform(X)
+        
+        # get anomaly score
+        # lower score means more anomalous
+        score = self.isolation_forest.score_samples(X_scaled)
+        
+        # get anomaly prediction from the same score
+        prediction = self.get_anomaly_prediction(score)
+        
+        return prediction, score
+    
+    
+    def get_pool(self, n_jobs):
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        # workers are kept so repeated chunks skip start up
+        if self.pool is not None and self.pool_jobs == n_jobs:
+            return self.pool
+        
+        self.close_pool()
+        
+        onnx_path = self.onnx_path if self.onnx_session is not None else None
+        self.pool = ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=init_worker,
+            initargs=(self.scaler, self.isolation_forest, onnx_path, self.score_offset)
+        )
+        self.pool_jobs = n_jobs
+        
+        return self.pool
+    
+    
+    def close_pool(self):
+        
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+            self.pool_jobs = 0
+    
+    
+    def score_samples_parallel(self, X, n_jobs=None):
+        
+        if n_jobs is None:
+            n_jobs = self.score_jobs
+        
+        n_jobs = get_num_jobs(n_jobs)
+        num_rows = len(X)
+        
+        # one shard per worker so every worker is busy on each batch
+        shard_size = max(1, int(np.ceil(num_rows / n_jobs)))
+        starts = list(range(0, num_rows, shard_size))
+        
+        pool = self.get_pool(n_jobs)
+        futures = []
+        for begin in starts:
+            if hasattr(X, "iloc"):
+                chunk = X.iloc[begin:begin + shard_size]
+            else:
+                chunk = X[begin:begin + shard_size]
+            futures.append(pool.submit(score_chunk_in_worker, chunk))
+        
+        scores = np.empty(num_rows, dtype=np.float64)
+        for begin, future in zip(starts, futures):
+            part = future.result()
+            scores[begin:begin + len(part)] = part
+        
+        return scores
+    
+    
+    def get_anomaly_prediction(self, score):
+        
+        # same rule as isolation_forest.predict without walking the trees again
+        # -1 means anomaly, 1 means normal
+        decision = score - self.score_offset
+        prediction = np.where(decision < 0, -1, 1)
+        
+        return prediction
+    
+    
     def get_fraud_level(self, score):
         
         if score <= self.threshold_scores["very_suspicious"]:
@@ -115,136 +358,427 @@ class AksumFraudDetector:
     
     def find_suspicious_features(self, customer_data):
         
-        suspicious = []
-        
-        # check payment delay
-        if customer_data["payment_delay_days_avg"] > 45:
-            suspicious.append({
-                "feature": "payment_delay_days_avg",
-                "value": customer_data["payment_delay_days_avg"],
-                "reason": "Very high payment delays"
-            })
-        
-        # check credit utilization
-        if customer_data["credit_utilization_pct"] > 100:
-            suspicious.append({
-                "feature": "credit_utilization_pct",
-                "value": customer_data["credit_utilization_pct"],
-                "reason": "Over credit limit"
-            })
-        
-        # check dispute rate
-        if customer_data["dispute_rate"] > 20:
-            suspicious.append({
-                "feature": "dispute_rate",
-                "value": customer_data["dispute_rate"],
-                "reason": "Too many disputes"
-            })
-        
-        # check late payment rate
-        if customer_data["late_payment_rate"] > 40:
-            suspicious.append({
-                "feature": "late_payment_rate",
-                "value": customer_data["late_payment_rate"],
-                "reason": "Excessive late payments"
-            })
-        
-        # check sudden changes
-        if customer_data["lead_time_variance"] > 20:
-            suspicious.append({
-                "feature": "lead_time_variance",
-                "value": customer_data["lead_time_variance"],
-                "reason": "Irregular ordering pattern"
-            })
-        
-        # check low order frequency with high credit
-        if customer_data["order_frequency_per_month"] < 2 and customer_data["credit_utilization_pct"] > 80:
-            suspicious.append({
-                "feature": "order_frequency_per_month",
-                "value": customer_data["order_frequency_per_month"],
-                "reason": "Low orders but high credit usage"
-            })
+        # rules come from config or the rules file
+        self.rule_engine.reload_if_changed()
+        
+        if isinstance(customer_data, dict):
+            X = np.array([[float(customer_data[name]) for name in self.feature_names]])
+        else:
+            X = customer_data[self.feature_names]
+        
+        suspicious = self.rule_engine.explain(X)[0]
         
         return suspicious
     
     
+    def get_fraud_levels(self, scores):
+        
+        # same rules as get_fraud_level for a whole array
+        scores = np.asarray(scores)
+        levels = np.full(len(scores), "LOW", dtype=object)
+        
+        levels[scores <= self.threshold_scores["unusual"]] = "MEDIUM"
+        levels[scores <= self.threshold_scores["suspicious"]] = "HIGH"
+        levels[scores <= self.threshold_scores["very_suspicious"]] = "VERY HIGH"
+        
+        return levels
+    
+    
+    def score_batch(self, customers_df):
+        
+        # scale and score the whole matrix once
+        X = customers_df[self.feature_names]
+        prediction, scores = self.score_matrix(X)
+        
+        is_anomaly = prediction == -1
+        levels = self.get_fraud_levels(scores)
+        
+        return is_anomaly, scores, levels
+    
+    
     def batch_detect(self, customers_df):
         
         # detect fraud for multiple customers
+        is_anomaly, scores, levels = self.score_batch(customers_df)
+        
+        # all rules over the whole matrix at once
+        self.rule_engine.reload_if_changed()
+        X = customers_df[self.feature_names].to_numpy(dtype=float)
+        suspicious = self.rule_engine.explain(X)
+        
+        if "customer_id" in customers_df.columns:
+            customer_ids = customers_df["customer_id"].tolist()
+        else:
+            customer_ids = ["Unknown"] * len(customers_df)
+        
         results = []
         
-        for idx, row in customers_df.iterrows():
-            customer_dict = row.to_dict()
-            result = self.detect_fraud(customer_dict)
-            result["customer_id"] = row.get("customer_id", "Unknown")
+        for i in range(len(customer_ids)):
+            result = {
+                "is_anomaly": int(is_anomaly[i]),
+                "anomaly_score": float(round(scores[i], 4)),
+                "fraud_risk_level": levels[i],
+                "suspicious_features": suspicious[i],
+                "customer_id": customer_ids[i],
+            }
             results.append(result)
         
         return results
     
     
+    def count_fraud_levels(self, is_anomaly, levels):
+        
+        # counts for one batch, can be added across batches
+        counts = {
+            "total_customers": int(len(levels)),
+            "anomalies_detected": int(np.count_nonzero(is_anomaly)),
+            "very_high_risk": int(np.count_nonzero(levels == "VERY HIGH")),
+            "high_risk": int(np.count_nonzero(levels == "HIGH")),
+            "medium_risk": int(np.count_nonzero(levels == "MEDIUM")),
+            "low_risk": int(np.count_nonzero(levels == "LOW")),
+        }
+        
+        return counts
+    
+    
     def get_fraud_statistics(self, customers_df):
         
         # analyze fraud patterns in portfolio
+        is_anomaly, scores, levels = self.score_batch(customers_df)
+        counts = self.count_fraud_levels(is_anomaly, levels)
+        
+        total = counts["total_customers"]
+        anomalies = counts["anomalies_detected"]
+        
+        stats = {
+            "total_customers": total,
+            "anomalies_detected": anomalies,
+            "anomaly_rate_pct": round(anomalies / total * 100, 2),
+            "very_high_risk": counts["very_high_risk"],
+            "high_risk": counts["high_risk"],
+            "medium_risk": counts["medium_risk"],
+            "low_risk": counts["low_risk"],
+        }
+        
+        return stats
+    
+    
+    def iter_portfolio_chunks(self, input_path, chunk_size):
+        
+        from utils.portfolio_reader import iter_portfolio_chunks
         
-        results = self.batch_detect(customers_df)
+        return iter_portfolio_chunks(input_path, chunk_size)
+    
+    
+    def stream_fraud_sweep(self, input_path, output_path, chunk_size=None, refresh_thresholds=False):
+        
+        import pandas as pd
+        
+        # score a portfolio file chunk by chunk with constant memory
+        if chunk_size is None:
+            chunk_size = config.FRAUD_SWEEP_CHUNK_SIZE
         
-        total = len(results)
-        anomalies = 0
-        very_high_risk = 0
-        high_risk = 0
-        medium_risk = 0
-        low_risk = 0
+        # a fresh sketch would only see this portfolio
+        if refresh_thresholds and self.score_sketch is None:
+            raise ValueError("No score sketch for this detector, retrain it before refreshing thresholds")
         
-        for result in results:
-            if result["is_anomaly"] == 1:
-                anomalies = anomalies + 1
+        print("Streaming fraud sweep over " + str(input_path))
+        
+        totals = None
+        flagged = 0
+        first_chunk = True
+        
+        for chunk in self.iter_portfolio_chunks(input_path, chunk_size):
+            
+            # a long sweep picks up rule edits between chunks
+            self.rule_engine.reload_if_changed()
             
-            level = result["fraud_risk_level"]
-            if level == "VERY HIGH":
-                very_high_risk = very_high_risk + 1
-            elif level == "HIGH":
-                high_risk = high_risk + 1
-            elif level == "MEDIUM":
-                medium_risk = medium_risk + 1
+            is_anomaly, scores, levels = self.score_batch(chunk)
+            
+            # levels in this sweep use the old thresholds, the new ones apply from the next
+            if refresh_thresholds:
+                self.score_sketch.update(scores)
+            
+            # running counts per fraud level
+            counts = self.count_fraud_levels(is_anomaly, levels)
+            if totals is None:
+                totals = counts
             else:
-                low_risk = low_risk + 1
+                for key in totals:
+                    totals[key] = totals[key] + counts[key]
+            
+            # flagged customers go straight to the output file
+            flag_mask = is_anomaly | np.isin(levels, config.FRAUD_FLAG_LEVELS)
+            
+            if np.any(flag_mask):
+                
+                X = chunk[self.feature_names].to_numpy(dtype=float)[flag_mask]
+                suspicious = self.rule_engine.explain(X)
+                
+                reasons = []
+                for items in suspicious:
+                    reasons.append("; ".join(item["reason"] for item in items))
+                
+                if "customer_id" in chunk.columns:
+                    customer_ids = chunk["customer_id"].to_numpy()[flag_mask]
+                else:
+                    customer_ids = ["Unknown"] * int(flag_mask.sum())
+                
+                out = pd.DataFrame({
+                    "customer_id": customer_ids,
+                    "is_anomaly": is_anomaly[flag_mask].astype(int),
+                    "anomaly_score": np.round(scores[flag_mask], 4),
+                    "fraud_risk_level": levels[flag_mask],
+                    "suspicious_patterns": reasons,
+                })
+                
+                out.to_csv(output_path, mode="w" if first_chunk else "a", header=first_chunk, index=False)
+                first_chunk = False
+                flagged = flagged + len(out)
+        
+        # header only file when nothing was flagged
+        if first_chunk:
+            pd.DataFrame(columns=FLAGGED_COLUMNS).to_csv(output_path, index=False)
+        
+        if totals is None:
+            totals = self.count_fraud_levels(np.zeros(0, dtype=bool), np.zeros(0, dtype=object))
+        
+        if refresh_thresholds:
+            self.set_thresholds_from_sketch()
+        
+        total = totals["total_customers"]
+        anomalies = totals["anomalies_detected"]
         
         stats = {
             "total_customers": total,
             "anomalies_detected": anomalies,
-            "anomaly_rate_pct": round(anomalies / total * 100, 2),
-            "very_high_risk": very_high_risk,
-            "high_risk": high_risk,
-            "medium_risk": medium_risk,
-            "low_risk": low_risk,
+            "anomaly_rate_pct": round(anomalies / total * 100, 2) if total > 0 else 0,
+            "very_high_risk": totals["very_high_risk"],
+            "high_risk": totals["high_risk"],
+            "medium_risk": totals["medium_risk"],
+            "low_risk": totals["low_risk"],
+            "flagged_customers": flagged,
         }
         
+        print("Fraud sweep done, flagged " + str(flagged) + " of " + str(total) + " customers")
+        
         return stats
     
     
     def save_detector(self, folder_path):
         
+        import joblib
+        
         print("Saving fraud detector...")
         
-        # save isolation forest
-        model_path = os.path.join(folder_path, "fraud_detector.pkl")
-        joblib.dump(self.isolation_forest, model_path)
+        config.ensure_dirs()
         
-        # save scaler
-        scaler_path = os.path.join(folder_path, "fraud_scaler.pkl")
-        joblib.dump(self.scaler, scaler_path)
+        # pickles are only for retraining and exports, serving reads the bundle
+        # a bundle loaded detector has none, so leave the files on disk
+        if self.isolation_forest is not None:
+            
+            # save isolation forest
+            model_path = os.path.join(folder_path, "fraud_detector.pkl")
+            joblib.dump(self.isolation_forest, model_path)
+            
+            # save scaler
+            scaler_path = os.path.join(folder_path, "fraud_scaler.pkl")
+            joblib.dump(self.scaler, scaler_path)
+            
+            # save thresholds
+            threshold_path = os.path.join(folder_path, "fraud_thresholds.pkl")
+            joblib.dump(self.threshold_scores, threshold_path)
+            
+            # a retrained forest must not be served by the old graph
+            if self.backend == "onnx":
+                self.export_onnx(folder_path)
         
-        # save thresholds
-        threshold_path = os.path.join(folder_path, "fraud_thresholds.pkl")
-        joblib.dump(self.threshold_scores, threshold_path)
+        # forest arrays, thresholds and sketch for serving
+        self.save_bundle(folder_path)
         
         print("Fraud detector saved to " + folder_path)
     
     
+    def get_bundle_path(self, folder_path):
+        return os.path.join(folder_path, config.FRAUD_BUNDLE_NAME)
+    
+    
+    def save_bundle(self, folder_path):
+        
+        from models.fast_isolation_forest import export_isolation_forest
+        from models.fraud_bundle import write_bundle
+        from utils.model_version import get_arrays_version
+        
+        # forest and scaler as flat arrays, sketch alongside
+        # after a bundle load the scorer arrays are written back as they are
+        if self.isolation_forest is not None:
+            arrays = export_isolation_forest(self.scaler, self.isolation_forest)
+        elif self.fast_scorer is not None:
+            arrays = self.fast_scorer.get_arrays()
+        else:
+            raise ValueError("No fraud detector loaded, nothing to save")
+        
+        detector_version = get_arrays_version(arrays)
+        
+        if self.score_sketch is not None:
+            arrays.update(self.score_sketch.get_arrays())
+        
+        meta = {
+            "detector_version": detector_version,
+            "score_offset": float(self.score_offset),
+            "contamination": float(self.contamination),
+            "threshold_scores": {},
+        }
+        for key, value in self.threshold_scores.items():
+            meta["threshold_scores"][key] = float(value)
+        
+        manifest = write_bundle(self.get_bundle_path(folder_path), arrays, meta)
+        
+        print("Fraud bundle " + manifest["bundle_id"] + " saved")
+        
+        return manifest
+    
+    
+    def validate_bundle(self, folder_path):
+        
+        from models.fraud_bundle import validate_bundle
+        
+        return validate_bundle(self.get_bundle_path(folder_path))
+    
+    
+    def load_bundle(self, folder_path, validate=None):
+        
+        from models.fast_isolation_forest import AksumFastIsolationForest
+        from models.fraud_bundle import read_bundle
+        
+        if validate is None:
+            validate = config.FRAUD_BUNDLE_VERIFY
+        
+        # build everything first so a bad bundle leaves the detector as it was
+        manifest, arrays = read_bundle(self.get_bundle_path(folder_path), validate)
+        
+        scorer = AksumFastIsolationForest(arrays)
+        
+        sketch = None
+        if "sketch_items" in arrays:
+            sketch = AksumQuantileSketch().set_arrays(arrays)
+        
+        self.fast_scorer = scorer
+        self.score_sketch = sketch
+        self.score_offset = manifest["score_offset"]
+        self.threshold_scores = manifest["threshold_scores"]
+        self.bundle_id = manifest["bundle_id"]
+        self.detector_version = manifest.get("detector_version")
+        
+        print("Fraud bundle " + self.bundle_id + " loaded")
+        
+        return self.fast_scorer
+    
+    
+    def get_detector_version(self):
+        
+        from models.fast_isolation_forest import export_isolation_forest
+        from utils.model_version import get_arrays_version
+        
+        # fingerprint of forest and scaler, bundles store it in the manifest
+        if self.detector_version is not None:
+            return self.detector_version
+        
+        if self.isolation_forest is not None:
+            arrays = export_isolation_forest(self.scaler, self.isolation_forest)
+        elif self.fast_scorer is not None:
+            arrays = self.fast_scorer.get_arrays()
+        else:
+            raise ValueError("No fraud detector loaded, cannot check the ONNX graph")
+        
+        self.detector_version = get_arrays_version(arrays)
+        
+        return self.detector_version
+    
+    
+    def export_onnx(self, folder_path):
+        
+        from models.onnx_backend import export_fraud_pipeline
+        
+        # scaler and forest in one onnx graph, offset and thresholds stay in the bundle
+        onnx_path = os.path.join(folder_path, "fraud_detector.onnx")
+        export_fraud_pipeline(self.scaler, self.isolation_forest, onnx_path, self.get_detector_version())
+        
+        print("Fraud detector exported to ONNX")
+    
+    
+    def load_onnx(self, folder_path):
+        
+        from models.onnx_backend import AksumOnnxSession
+        
+        onnx_path = os.path.join(folder_path, "fraud_detector.onnx")
+        session = AksumOnnxSession(onnx_path)
+        
+        # a graph from an older forest would be scored against new offset and thresholds
+        if session.metadata.get("model_version") != self.get_detector_version():
+            raise ValueError("ONNX fraud detector does not match the loaded detector, re-run jobs/export_onnx.py")
+        
+        self.onnx_session = session
+        self.onnx_path = onnx_path
+        
+        print("ONNX fraud detector loaded")
+        
+        return self.onnx_session
+    
+    
+    def check_onnx_parity(self, customers_df, tolerance=None):
+        
+        # compare onnx scores with the sklearn ones
+        if tolerance is None:
+            tolerance = config.ONNX_PARITY_TOLERANCE
+        
+        X = customers_df[self.feature_names]
+        X_scaled = self.scaler.transform(X)
+        
+        native_pred = self.isolation_forest.predict(X_scaled)
+        native_score = self.isolation_forest.score_samples(X_scaled)
+        
+        onnx_pred, decision = self.onnx_session.score_anomaly(X)
+        onnx_score = decision + self.score_offset
+        
+        max_diff = float(np.max(np.abs(native_score - onnx_score)))
+        mismatches = int(np.sum(native_pred != onnx_pred))
+        
+        result = {
+            "max_abs_diff": max_diff,
+            "label_mismatches": mismatches,
+            "passed": max_diff <= tolerance and mismatches == 0,
+        }
+        
+        return result
+    
+    
     def load_detector(self, folder_path):
         
         print("Loading fraud detector...")
         
+        # bundle has forest arrays, thresholds and sketch in one place
+        if os.path.exists(self.get_bundle_path(folder_path)):
+            self.load_bundle(folder_path)
+            if not self.use_fast_scorer:
+                self.fast_scorer = None
+        
+        # sklearn objects only for jobs that retrain, export or score in bulk
+        # and for folders saved before the bundle existed
+        if not self.use_fast_scorer or self.bundle_id is None:
+            self.load_forest(folder_path)
+        
+        # onnx backend scores with its own graph, checked against the forest above
+        if self.backend == "onnx":
+            self.load_onnx(folder_path)
+        
+        print("Fraud detector loaded from " + folder_path)
+    
+    
+    def load_forest(self, folder_path):
+        
+        import joblib
+        
         # load isolation forest
         model_path = os.path.join(folder_path, "fraud_detector.pkl")
         self.isolation_forest = joblib.load(model_path)
@@ -253,11 +787,13 @@ class AksumFraudDetector:
         scaler_path = os.path.join(folder_path, "fraud_scaler.pkl")
         self.scaler = joblib.load(scaler_path)
         
-        # load thresholds
-        threshold_path = os.path.join(folder_path, "fraud_thresholds.pkl")
-        self.threshold_scores = joblib.load(threshold_path)
+        self.score_offset = float(self.isolation_forest.offset_)
+        self.detector_version = None
         
-        print("Fraud detector loaded from " + folder_path)
+        # thresholds come from the bundle when there is one
+        if self.bundle_id is None:
+            threshold_path = os.path.join(folder_path, "fraud_thresholds.pkl")
+            self.threshold_scores = joblib.load(threshold_path)
         
         return self.isolation_forest
     
@@ -0,0 +1,180 @@
+# fraud_rules.py
+# suspicious pattern rules evaluated as boolean masks
+
+import numpy as np
+import json
+import os
+import sys
+
+sys.path.append("..")
+import config
+
+
+OPERATORS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+# what a malformed rules file can raise, bad json is a ValueError
+RULE_ERRORS = (ValueError, KeyError, TypeError)
+
+
+def load_rules(path=None):
+    
+    # rules file lets the risk team change rules without a deploy
+    if path is None:
+        path = config.FRAUD_RULES_PATH
+    
+    if path is not None and os.path.exists(str(path)):
+        with open(str(path)) as f:
+            return json.load(f)
+    
+    return config.FRAUD_RULES
+
+
+class AksumRuleEngine:
+    
+    def __init__(self, rules=None, rules_path=None):
+        
+        self.feature_names = config.FEATURE_NAMES
+        self.rules_path = rules_path if rules_path is not None else config.FRAUD_RULES_PATH
+        self.rules_mtime = None
+        self.compiled = []
+        
+        if rules is not None:
+            self.compile(rules)
+            return
+        
+        # a broken rules file at start up falls back to the config rules
+        self.rules_mtime = self.get_rules_mtime()
+        try:
+            self.compile(load_rules(self.rules_path))
+        except RULE_ERRORS as e:
+            print("Fraud rules file rejected, using config rules: " + str(e))
+            self.compile(config.FRAUD_RULES)
+    
+    
+    def compile(self, rules):
+        
+        # turn each rule into column index, operator and threshold
+        compiled = []
+        
+        for rule in rules:
+            
+            # simple rule is one condition, compound rule has "all"
+            if "all" in rule:
+                conditions = rule["all"]
+            else:
+                conditions = [rule]
+            
+            checks = []
+            for cond in conditions:
+                
+                if cond["feature"] not in self.feature_names:
+                    raise ValueError("Unknown feature in fraud rule: " + str(cond["feature"]))
+                if cond["op"] not in OPERATORS:
+                    raise ValueError("Unknown operator in fraud rule: " + str(cond["op"]))
+                
+                col = self.feature_names.index(cond["feature"])
+                checks.append((col, OPERATORS[cond["op"]], float(cond["threshold"])))
+            
+            # feature reported for the rule, first condition by default
+            feature = rule.get("feature", conditions[0]["feature"])
+            if feature not in self.feature_names:
+                raise ValueError("Unknown feature in fraud rule: " + str(feature))
+            
+            compiled.append({
+                "feature": feature,
+                "column": self.feature_names.index(feature),
+                "reason": rule["reason"],
+                "checks": checks,
+            })
+        
+        self.compiled = compiled
+        
+        return self.compiled
+    
+    
+    def get_rules_mtime(self):
+        
+        if self.rules_path is None or not os.path.exists(str(self.rules_path)):
+            return None
+        
+        return os.path.getmtime(str(self.rules_path))
+    
+    
+    def reload_if_changed(self):
+        
+        # pick up edits to the rules file
+        mtime = self.get_rules_mtime()
+        if mtime == self.rules_mtime:
+            return False
+        
+        # mtime is recorded either way so a bad file is reported once
+        self.rules_mtime = mtime
+        
+        # compile builds the new list first, so the old rules stay on failure
+        try:
+            self.compile(load_rules(self.rules_path))
+        except RULE_ERRORS as e:
+            print("Fraud rules file rejected, keeping previous rules: " + str(e))
+            return False
+        
+        print("Fraud rules reloaded")
+        
+        return True
+    
+    
+    def evaluate(self, X):
+        
+        # one boolean column per rule for all customers
+        X = np.asarray(X, dtype=float)
+        masks = np.zeros((X.shape[0], len(self.compiled)), dtype=bool)
+        
+        for j in range(len(self.compiled)):
+            
+            mask = np.ones(X.shape[0], dtype=bool)
+            for col, op, threshold in self.compiled[j]["checks"]:
+                mask &= op(X[:, col], threshold)
+            
+            masks[:, j] = mask
+        
+        return masks
+    
+    
+    def explain(self, X, masks=None):
+        
+        # list of triggered rules for each customer
+        X = np.asarray(X, dtype=float)
+        if masks is None:
+            masks = self.evaluate(X)
+        
+        results = [[] for i in range(X.shape[0])]
+        
+        # only build dicts for rules that fired
+        rows, rules = np.nonzero(masks)
+        for i, j in zip(rows, rules):
+            rule = self.compiled[j]
+            results[i].append({
+                "feature": rule["feature"],
+                "value": float(X[i, rule["column"]]),
+                "reason": rule["reason"],
+            })
+        
+        return results
+    
+    
+    def count_hits(self, masks):
+        
+        # customers flagged by each rule
+        counts = {}
+        hits = masks.sum(axis=0)
+        
+        for j in range(len(self.compiled)):
+            counts[self.compiled[j]["reason"]] = int(hits[j])
+        
+        return counts
\ No newline at end of file
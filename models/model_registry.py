@@ -0,0 +1,310 @@
+# model_registry.py
+# champion / challenger credit models with shadow scoring
+
+import numpy as np
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.append("..")
+import config
+from explainability.explanation_cache import AksumExplanationCache
+
+
+# champion latency is one single-row call, the challenger one is a
+# batched call divided by the batch size, so the two are not comparable
+SHADOW_LOG_COLUMNS = [
+    "timestamp",
+    "challenger",
+    "tier",
+    "champion_prob",
+    "challenger_prob",
+    "delta",
+    "champion_category",
+    "challenger_category",
+    "category_flip",
+    "champion_latency_ms",
+    "challenger_row_latency_ms",
+]
+
+
+class AksumModelRegistry:
+    
+    def __init__(self, log_path=None):
+        
+        self.models = {}
+        self.champion_name = None
+        self.log_path = log_path if log_path is not None else str(config.SHADOW_LOG_PATH)
+        self.batch_size = config.SHADOW_BATCH_SIZE
+        
+        # shadow work happens off the request path
+        self.shadow_queue = queue.Queue(maxsize=config.SHADOW_QUEUE_SIZE)
+        self.shadow_thread = None
+        self.dropped = 0
+        
+        # explanations of the current champion, keyed by feature values
+        self.explain_cache = AksumExplanationCache()
+        self.explained_model = None
+        
+        print("Aksum Model Registry initialized")
+    
+    
+    def register(self, name, model, champion=False):
+        
+        self.models[name] = model
+        
+        if champion or self.champion_name is None:
+            self.champion_name = name
+        
+        print("Registered model: " + name)
+    
+    
+    def load_model(self, name, filepath, champion=False):
+        
+        from models.xgboost_model import AksumCreditModel
+        
+        model = AksumCreditModel()
+        model.load_model(filepath)
+        self.register(name, model, champion=champion)
+        
+        return model
+    
+    
+    def set_champion(self, name):
+        
+        if name not in self.models:
+            raise ValueError("Unknown model: " + str(name))
+        
+        self.champion_name = name
+        print("Champion is now: " + name)
+    
+    
+    def get_champion(self):
+        return self.models[self.champion_name]
+    
+    
+    def get_challengers(self):
+        
+        challengers = []
+        for name, model in self.models.items():
+            if name != self.champion_name:
+                challengers.append((name, model))
+        
+        return challengers
+    
+    
+    def predict_single(self, customer_data, tier="full"):
+        
+        champion = self.get_champion()
+        
+        # features built once and shared with challengers
+        X = champion.build_features(customer_data)
+        
+        start = time.perf_counter()
+        prob = champion.predict_proba_matrix(X, tier)[0]
+        latency_ms = (time.perf_counter() - start) * 1000
+        
+        result = champion.build_result(prob)
+        
+        self.submit_shadow(X, prob, latency_ms, tier)
+        
+        return result
+    
+    
+    def check_explain_cache(self, champion):
+        
+        # set_champion and reloads swap the classifier, identity spots both
+        if champion.model is not self.explained_model:
+            self.explained_model = champion.model
+            self.explain_cache.set_model_version(champion.get_model_version())
+    
+    
+    def predict_and_explain(self, customer_data, tier="full", approximate=False):
+        
+        from explainability.contributions import build_explanation
+        from explainability.contributions import get_cache_extra
+        
+        champion = self.get_champion()
+        X = champion.build_features(customer_data)
+        
+        self.check_explain_cache(champion)
+        key = self.explain_cache.make_key(X[0], get_cache_extra("contribs", tier, approximate))
+        explanation = self.explain_cache.get(key)
+        
+        # cache hit only skips the contributions, the score is always computed
+        start = time.perf_counter()
+        if explanation is None:
+            prob, contribs, base_value = champion.predict_with_contributions(X, tier, approximate)
+            prob = prob[0]
+        else:
+            prob = champion.predict_proba_matrix(X, tier)[0]
+        latency_ms = (time.perf_counter() - start) * 1000
+        
+        result = champion.build_result(prob)
+        
+        if explanation is None:
+            explanation = build_explanation(champion.feature_names, contribs[0], X[0], base_value)
+            self.explain_cache.put(key, explanation)
+        
+        self.submit_shadow(X, prob, latency_ms, tier)
+        
+        return result, explanation
+    
+    
+    def submit_shadow(self, X, champion_prob, champion_latency_ms, tier="full"):
+        
+        if len(self.models) < 2:
+            return
+        
+        self.start_shadow_worker()
+        
+        # never block the request, drop if shadow is behind
+        try:
+            self.shadow_queue.put_nowait((time.time(), X, float(champion_prob), champion_latency_ms, tier))
+        except queue.Full:
+            self.dropped = self.dropped + 1
+    
+    
+    def start_shadow_worker(self):
+        
+        if self.shadow_thread is not None:
+            return
+        
+        self.shadow_thread = threading.Thread(target=self.shadow_worker, daemon=True)
+        self.shadow_thread.start()
+    
+    
+    def shadow_worker(self):
+        
+        while True:
+            
+            # wait for one item then drain a batch
+            items = [self.shadow_queue.get()]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self.shadow_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                self.score_shadow_batch(items)
+            except Exception as e:
+                print("Shadow scoring failed: " + str(e))
+            
+            for i in range(len(items)):
+                self.shadow_queue.task_done()
+    
+    
+    def score_shadow_batch(self, items):
+        
+        # challengers must use the tier the champion answered with
+        by_tier = {}
+        for item in items:
+            by_tier.setdefault(item[4], []).append(item)
+        
+        lines = []
+        for tier, tier_items in by_tier.items():
+            lines.extend(self.score_shadow_tier(tier, tier_items))
+        
+        self.write_log(lines)
+    
+    
+    def score_shadow_tier(self, tier, items):
+        
+        champion = self.get_champion()
+        
+        # stack queued rows into one matrix
+        X = np.vstack([item[1] for item in items])
+        champion_probs = np.array([item[2] for item in items])
+        
+        lines = []
+        
+        for name, model in self.get_challengers():
+            
+            # one batched call per challenger, reported per row
+            start = time.perf_counter()
+            probs = model.predict_proba_matrix(X, tier)
+            row_latency_ms = (time.perf_counter() - start) * 1000 / len(items)
+            
+            deltas = probs - champion_probs
+            
+            for i in range(len(items)):
+                champion_cat = champion.get_risk_category(champion_probs[i], "strict")
+                challenger_cat = model.get_risk_category(probs[i], "strict")
+                
+                line = [
+                    str(round(items[i][0], 3)),
+                    name,
+                    tier,
+                    str(round(float(champion_probs[i]), 4)),
+                    str(round(float(probs[i]), 4)),
+                    str(round(float(deltas[i]), 4)),
+                    champion_cat,
+                    challenger_cat,
+                    str(int(champion_cat != challenger_cat)),
+                    str(round(items[i][3], 4)),
+                    str(round(row_latency_ms, 4)),
+                ]
+                lines.append(",".join(line))
+        
+        return lines
+    
+    
+    def write_log(self, lines):
+        
+        if len(lines) == 0:
+            return
+        
+        # header only for a new file
+        config.ensure_dirs()
+        header = ",".join(SHADOW_LOG_COLUMNS)
+        new_file = not os.path.exists(self.log_path)
+        
+        # logs written with older columns are moved aside, not appended to
+        if not new_file:
+            with open(self.log_path) as f:
+                old_header = f.readline().strip()
+            if old_header != header:
+                os.replace(self.log_path, self.log_path + ".old")
+                new_file = True
+        
+        with open(self.log_path, "a") as f:
+            if new_file:
+                f.write(header + "\n")
+            f.write("\n".join(lines) + "\n")
+    
+    
+    def flush(self, timeout=5.0):
+        
+        # wait for queued shadow work, used at shutdown
+        if self.shadow_thread is None:
+            return
+        
+        end = time.time() + timeout
+        while self.shadow_queue.unfinished_tasks > 0 and time.time() < end:
+            time.sleep(0.01)
+    
+    
+    def get_shadow_summary(self):
+        
+        import pandas as pd
+        
+        if not os.path.exists(self.log_path):
+            return {}
+        
+        log = pd.read_csv(self.log_path)
+        
+        summary = {}
+        for (name, tier), group in log.groupby(["challenger", "tier"]):
+            summary[name + "/" + tier] = {
+                "num_scored": int(len(group)),
+                "mean_abs_delta": round(float(group["delta"].abs().mean()), 4),
+                "max_abs_delta": round(float(group["delta"].abs().max()), 4),
+                "category_flip_rate_pct": round(float(group["category_flip"].mean() * 100), 2),
+                "champion_latency_ms": round(float(group["champion_latency_ms"].mean()), 4),
+                "challenger_row_latency_ms": round(float(group["challenger_row_latency_ms"].mean()), 4),
+            }
+        
+        return summary
\ No newline at end of file
@@ -0,0 +1,142 @@
+# online_detector.py
+# streaming half-space trees for live customer updates
+
+import numpy as np
+import sys
+
+sys.path.append("..")
+import config
+
+
+class AksumHalfSpaceTrees:
+    
+    def __init__(self, mins, maxs, n_trees=None, depth=None, window_size=None, seed=42):
+        
+        self.mins = np.asarray(mins, dtype=np.float64)
+        self.ranges = np.asarray(maxs, dtype=np.float64) - self.mins
+        self.ranges[self.ranges == 0] = 1
+        
+        self.n_trees = n_trees if n_trees is not None else config.FRAUD_ONLINE_TREES
+        self.depth = depth if depth is not None else config.FRAUD_ONLINE_DEPTH
+        self.window_size = window_size if window_size is not None else config.FRAUD_ONLINE_WINDOW
+        self.size_limit = max(1, int(self.window_size * config.FRAUD_ONLINE_SIZE_LIMIT))
+        
+        num_features = len(self.mins)
+        num_nodes = 2 ** (self.depth + 1) - 1
+        
+        # mass per node for the reference and the latest window
+        self.ref_mass = np.zeros((self.n_trees, num_nodes), dtype=np.int32)
+        self.latest_mass = np.zeros((self.n_trees, num_nodes), dtype=np.int32)
+        self.window_count = 0
+        self.windows_seen = 0
+        
+        self.build_trees(num_features, seed)
+        self.tree_idx = np.arange(self.n_trees)
+        self.level_weights = 2.0 ** np.arange(self.depth + 1)
+    
+    
+    def build_trees(self, num_features, seed):
+        
+        # random half-space splits over a perturbed unit workspace
+        rng = np.random.RandomState(seed)
+        num_internal = 2 ** self.depth - 1
+        
+        self.split_feature = np.zeros((self.n_trees, num_internal), dtype=np.int64)
+        self.split_value = np.zeros((self.n_trees, num_internal), dtype=np.float64)
+        
+        for t in range(self.n_trees):
+            
+            s = rng.uniform(0, 1, num_features)
+            half = 2 * np.maximum(s, 1 - s)
+            
+            # node ranges, children of node i are 2i+1 and 2i+2
+            low = np.zeros((num_internal, num_features))
+            high = np.zeros((num_internal, num_features))
+            low[0] = s - half
+            high[0] = s + half
+            
+            for node in range(num_internal):
+                
+                q = rng.randint(num_features)
+                mid = (low[node, q] + high[node, q]) / 2
+                
+                self.split_feature[t, node] = q
+                self.split_value[t, node] = mid
+                
+                left = 2 * node + 1
+                right = 2 * node + 2
+                if right < num_internal:
+                    low[left] = low[node]
+                    high[left] = high[node]
+                    high[left, q] = mid
+                    low[right] = low[node]
+                    high[right] = high[node]
+                    low[right, q] = mid
+    
+    
+    def get_path(self, x):
+        
+        # nodes visited in every tree, shape (n_trees, depth + 1)
+        x = (np.asarray(x, dtype=np.float64).reshape(-1) - self.mins) / self.ranges
+        
+        path = np.zeros((self.n_trees, self.depth + 1), dtype=np.int64)
+        node = np.zeros(self.n_trees, dtype=np.int64)
+        
+        for level in range(self.depth):
+            go_right = x[self.split_feature[self.tree_idx, node]] > self.split_value[self.tree_idx, node]
+            node = 2 * node + 1 + go_right
+            path[:, level + 1] = node
+        
+        return path
+    
+    
+    def score_path(self, path):
+        
+        # walk stops at the first node whose mass is below the size limit
+        # or at the leaf, that node's mass is scored
+        masses = self.ref_mass[self.tree_idx[:, None], path]
+        
+        below = masses < self.size_limit
+        stop = np.where(below.any(axis=1), np.argmax(below, axis=1), self.depth)
+        
+        terminal_mass = masses[self.tree_idx, stop]
+        score = float(np.sum(terminal_mass * self.level_weights[stop]))
+        
+        return score
+    
+    
+    def update_path(self, path):
+        
+        self.latest_mass[self.tree_idx[:, None], path] += 1
+        self.window_count = self.window_count + 1
+        
+        # latest window becomes the reference, adapts to drift
+        if self.window_count >= self.window_size:
+            self.ref_mass, self.latest_mass = self.latest_mass, self.ref_mass
+            self.latest_mass[:] = 0
+            self.window_count = 0
+            self.windows_seen = self.windows_seen + 1
+    
+    
+    def score(self, x):
+        return self.score_path(self.get_path(x))
+    
+    
+    def update(self, x):
+        self.update_path(self.get_path(x))
+    
+    
+    def score_and_update(self, x):
+        
+        # one traversal for both, fixed work per event
+        path = self.get_path(x)
+        score = self.score_path(path)
+        self.update_path(path)
+        
+        return score
+    
+    
+    def is_ready(self):
+        
+        # scores mean nothing until one full window is seen
+        return self.windows_seen > 0
\ No newline at end of file
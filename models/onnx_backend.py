@@ -0,0 +1,120 @@
+# onnx_backend.py
+# export models to onnx and run them with onnxruntime
+
+import numpy as np
+import copy
+import sys
+
+sys.path.append("..")
+import config
+
+
+def export_credit_model(xgb_model, filepath, num_trees=0, model_version=None):
+    
+    # converters only needed at export time
+    from onnxmltools.convert import convert_xgboost
+    from onnxmltools.convert.common.data_types import FloatTensorType
+    
+    model = copy.deepcopy(xgb_model)
+    
+    # keep only first trees for faster tiers
+    if num_trees > 0:
+        model._Booster = model.get_booster()[0:num_trees]
+    
+    # converter wants f0, f1 ... style feature names
+    model.get_booster().feature_names = None
+    
+    initial_types = [("input", FloatTensorType([None, len(config.FEATURE_NAMES)]))]
+    onnx_model = convert_xgboost(model, initial_types=initial_types, target_opset=config.ONNX_OPSET)
+    
+    # tie the export to the booster it came from
+    if model_version is not None:
+        entry = onnx_model.metadata_props.add()
+        entry.key = "model_version"
+        entry.value = str(model_version)
+    
+    with open(filepath, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+    
+    print("Credit model exported to: " + filepath)
+
+
+def export_fraud_pipeline(scaler, isolation_forest, filepath, model_version=None):
+    
+    # converters only needed at export time
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    from sklearn.pipeline import Pipeline
+    
+    pipeline = Pipeline([
+        ("scaler", scaler),
+        ("isolation_forest", isolation_forest),
+    ])
+    
+    initial_types = [("input", FloatTensorType([None, len(config.FEATURE_NAMES)]))]
+    onnx_model = convert_sklearn(
+        pipeline,
+        initial_types=initial_types,
+        target_opset={"": config.ONNX_OPSET, "ai.onnx.ml": 3}
+    )
+    
+    # tie the export to the detector it came from
+    if model_version is not None:
+        entry = onnx_model.metadata_props.add()
+        entry.key = "model_version"
+        entry.value = str(model_version)
+    
+    with open(filepath, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+    
+    print("Fraud pipeline exported to: " + filepath)
+
+
+class AksumOnnxSession:
+    
+    def __init__(self, filepath, num_threads=None):
+        
+        import onnxruntime as ort
+        
+        if num_threads is None:
+            num_threads = config.ONNX_INTRA_OP_THREADS
+        
+        # cpu only with fixed thread count
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        
+        self.session = ort.InferenceSession(
+            filepath,
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.metadata = dict(self.session.get_modelmeta().custom_metadata_map)
+    
+    
+    def run(self, X):
+        
+        X = np.asarray(X, dtype=np.float32)
+        outputs = self.session.run(None, {self.input_name: X})
+        
+        return outputs
+    
+    
+    def predict_proba(self, X):
+        
+        # outputs are label and class probabilities
+        outputs = self.run(X)
+        probs = np.asarray(outputs[1])
+        
+        return probs[:, 1]
+    
+    
+    def score_anomaly(self, X):
+        
+        # outputs are label and decision function
+        outputs = self.run(X)
+        labels = np.asarray(outputs[0]).reshape(-1)
+        decision = np.asarray(outputs[1]).reshape(-1)
+        
+        return labels, decision
@@ -0,0 +1,129 @@
+# quantile_sketch.py
+# mergeable streaming quantile sketch (kll) for fraud thresholds
+
+import numpy as np
+import sys
+
+sys.path.append("..")
+import config
+
+
+class AksumQuantileSketch:
+    
+    def __init__(self, k=None, seed=42):
+        
+        self.k = k if k is not None else config.FRAUD_SKETCH_K
+        self.levels = [np.zeros(0)]
+        self.count = 0
+        self.rng = np.random.RandomState(seed)
+    
+    
+    def get_capacity(self, level):
+        
+        # lower levels hold fewer items as the sketch grows
+        height = len(self.levels)
+        capacity = int(np.ceil(self.k * (2.0 / 3.0) ** (height - level - 1)))
+        
+        return max(capacity, 2)
+    
+    
+    def update(self, values):
+        
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        
+        # add in pieces so memory stays bounded by k
+        for begin in range(0, len(values), self.k):
+            piece = values[begin:begin + self.k]
+            self.levels[0] = np.concatenate([self.levels[0], piece])
+            self.count = self.count + len(piece)
+            self.compress()
+    
+    
+    def compress(self):
+        
+        level = 0
+        while level < len(self.levels):
+            
+            if len(self.levels[level]) >= self.get_capacity(level):
+                
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.zeros(0))
+                
+                items = np.sort(self.levels[level])
+                
+                # odd item out stays at this level
+                keep = items[:0]
+                if len(items) % 2 == 1:
+                    keep = items[-1:]
+                    items = items[:-1]
+                
+                # every other item moves up with double weight
+                start = self.rng.randint(2)
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[start::2]])
+                self.levels[level] = keep
+            
+            level = level + 1
+    
+    
+    def merge(self, other):
+        
+        # combine sketches built on different workers or days
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.zeros(0))
+        
+        for level in range(len(other.levels)):
+            self.levels[level] = np.concatenate([self.levels[level], other.levels[level]])
+        
+        self.count = self.count + other.count
+        self.compress()
+        
+        return self
+    
+    
+    def quantile(self, q):
+        
+        if self.count == 0:
+            raise ValueError("Quantile sketch is empty")
+        
+        # nothing compacted yet, so answer like np.percentile
+        if len(self.levels) == 1:
+            return float(np.percentile(self.levels[0], q * 100))
+        
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(self.levels[i]), 2.0 ** i) for i in range(len(self.levels))])
+        
+        order = np.argsort(items)
+        items = items[order]
+        cum_weights = np.cumsum(weights[order])
+        
+        idx = int(np.searchsorted(cum_weights, q * cum_weights[-1], side="left"))
+        idx = min(idx, len(items) - 1)
+        
+        return float(items[idx])
+    
+    
+    def get_arrays(self):
+        
+        # flat arrays so the sketch can be saved next to the model
+        arrays = {
+            "sketch_items": np.concatenate(self.levels),
+            "sketch_sizes": np.array([len(level) for level in self.levels], dtype=np.int64),
+            "sketch_count": np.asarray(self.count, dtype=np.int64),
+            "sketch_k": np.asarray(self.k, dtype=np.int64),
+        }
+        
+        return arrays
+    
+    
+    def set_arrays(self, arrays):
+        
+        self.k = int(arrays["sketch_k"])
+        self.count = int(arrays["sketch_count"])
+        
+        self.levels = []
+        begin = 0
+        for size in arrays["sketch_sizes"]:
+            self.levels.append(np.array(arrays["sketch_items"][begin:begin + int(size)]))
+            begin = begin + int(size)
+        
+        return self
\ No newline at end of file
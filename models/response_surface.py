@@ -0,0 +1,298 @@
+# response_surface.py
+# precomputed risk over dashboard slider grids
+
+import numpy as np
+import itertools
+import os
+import sys
+import time
+
+sys.path.append("..")
+import config
+
+
+def build_quick_check_features(sliders):
+    
+    # same fixed defaults as the quick check page
+    delay = np.asarray(sliders["delay"], dtype=float)
+    util = np.asarray(sliders["utilization"], dtype=float)
+    late_rate = np.asarray(sliders["late_rate"], dtype=float)
+    dispute = np.asarray(sliders["dispute_rate"], dtype=float)
+    
+    columns = {
+        "avg_monthly_orders": 10.0,
+        "total_purchase_amount": 500000.0,
+        "avg_order_value": 4166.67,
+        "payment_delay_days_avg": delay,
+        "payment_delay_days_max": delay * 1.5,
+        "credit_limit": 500000.0,
+        "credit_utilization_pct": util,
+        "num_invoices": 50,
+        "num_disputed_invoices": np.floor(50 * dispute / 100),
+        "dispute_rate": dispute,
+        "days_since_first_order": 365,
+        "order_frequency_per_month": 5.0,
+        "lead_time_variance": 5.0,
+        "num_late_payments": np.floor(50 * late_rate / 100),
+        "late_payment_rate": late_rate,
+    }
+    
+    return stack_columns(columns, len(delay))
+
+
+def build_risk_calculator_features(sliders):
+    
+    # same fixed defaults as the risk calculator page
+    delay = np.asarray(sliders["delay"], dtype=float)
+    util = np.asarray(sliders["utilization"], dtype=float)
+    late_rate = np.asarray(sliders["late_rate"], dtype=float)
+    dispute = np.asarray(sliders["dispute_rate"], dtype=float)
+    freq = np.asarray(sliders["order_frequency"], dtype=float)
+    
+    columns = {
+        "avg_monthly_orders": freq,
+        "total_purchase_amount": 500000.0,
+        "avg_order_value": 4000.0,
+        "payment_delay_days_avg": delay,
+        "payment_delay_days_max": delay * 1.5,
+        "credit_limit": 500000.0,
+        "credit_utilization_pct": util,
+        "num_invoices": 50,
+        "num_disputed_invoices": np.floor(50 * dispute / 100),
+        "dispute_rate": dispute,
+        "days_since_first_order": 365,
+        "order_frequency_per_month": freq,
+        "lead_time_variance": 5.0,
+        "num_late_payments": np.floor(50 * late_rate / 100),
+        "late_payment_rate": late_rate,
+    }
+    
+    return stack_columns(columns, len(delay))
+
+
+def stack_columns(columns, num_rows):
+    
+    # matrix in model feature order
+    X = np.empty((num_rows, len(config.FEATURE_NAMES)))
+    for i, name in enumerate(config.FEATURE_NAMES):
+        X[:, i] = columns[name]
+    
+    return X
+
+
+SURFACE_BUILDERS = {
+    "quick_check": build_quick_check_features,
+    "risk_calculator": build_risk_calculator_features,
+}
+
+
+class AksumResponseSurface:
+    
+    def __init__(self, name):
+        
+        self.name = name
+        self.slider_names = list(config.RESPONSE_SURFACES[name].keys())
+        self.builder = SURFACE_BUILDERS[name]
+        self.axes = []
+        self.values = None
+        self.model_version = None
+        
+        for slider in self.slider_names:
+            low, high, step = config.RESPONSE_SURFACES[name][slider]
+            num_points = int(round((high - low) / step)) + 1
+            self.axes.append(np.linspace(low, high, num_points))
+    
+    
+    def build(self, credit_model):
+        
+        print("Building response surface: " + self.name)
+        start = time.time()
+        
+        shape = tuple(len(axis) for axis in self.axes)
+        total = int(np.prod(shape))
+        
+        values = np.empty(total, dtype=np.float32)
+        batch_size = config.SURFACE_BATCH_SIZE
+        
+        # score the flattened grid in batches
+        for begin in range(0, total, batch_size):
+            
+            end = min(begin + batch_size, total)
+            grid_idx = np.unravel_index(np.arange(begin, end), shape)
+            
+            sliders = {}
+            for i, slider in enumerate(self.slider_names):
+                sliders[slider] = self.axes[i][grid_idx[i]]
+            
+            X = self.builder(sliders)
+            values[begin:end] = credit_model.predict_proba_matrix(X)
+        
+        self.values = values.reshape(shape)
+        self.model_version = credit_model.get_model_version()
+        
+        print("Surface built with " + str(total) + " points in " + str(round(time.time() - start, 1)) + "s")
+        
+        return self.values
+    
+    
+    def get_path(self, folder_path):
+        return os.path.join(str(folder_path), "surface_" + self.name + ".npz")
+    
+    
+    def save(self, folder_path):
+        
+        config.ensure_dirs()
+        
+        arrays = {
+            "values": self.values,
+            "model_version": np.array(self.model_version),
+            "slider_names": np.array(self.slider_names),
+        }
+        for i, slider in enumerate(self.slider_names):
+            arrays["axis_" + slider] = self.axes[i]
+        
+        # api and dashboard may rebuild at the same time, each writes its
+        # own temp file and the rename swaps in a complete file
+        path = self.get_path(folder_path)
+        temp_path = path[:-len(".npz")] + "." + str(os.getpid()) + ".tmp.npz"
+        np.savez(temp_path, **arrays)
+        os.replace(temp_path, path)
+        
+        print("Surface saved: " + self.get_path(folder_path))
+    
+    
+    def load(self, folder_path):
+        
+        data = np.load(self.get_path(folder_path))
+        
+        self.values = data["values"]
+        self.model_version = str(data["model_version"])
+        self.slider_names = [str(name) for name in data["slider_names"]]
+        self.axes = [data["axis_" + slider] for slider in self.slider_names]
+        
+        return self.values
+    
+    
+    def load_or_build(self, credit_model, folder_path=None):
+        
+        if folder_path is None:
+            folder_path = config.MODEL_DIR
+        
+        # rebuild when the grid or the model changed
+        if os.path.exists(self.get_path(folder_path)):
+            
+            expected_names = list(self.slider_names)
+            expected_axes = [axis.copy() for axis in self.axes]
+            self.load(folder_path)
+            
+            same_grid = expected_names == self.slider_names
+            if same_grid:
+                for i in range(len(self.axes)):
+                    if not np.array_equal(expected_axes[i], self.axes[i]):
+                        same_grid = False
+            
+            if same_grid and self.model_version == credit_model.get_model_version():
+                print("Response surface loaded: " + self.name)
+                return self
+            
+            self.slider_names = expected_names
+            self.axes = expected_axes
+        
+        # a grid that misses the model off its nodes is never saved or served
+        self.build(credit_model)
+        parity = self.check_parity(credit_model)
+        if not parity["passed"]:
+            raise ValueError(
+                "Response surface " + self.name + " failed its parity check (max abs error "
+                + str(parity["max_abs_error"]) + ", category agreement "
+                + str(parity["category_agreement_pct"]) + "%), use smaller steps in RESPONSE_SURFACES"
+            )
+        self.save(folder_path)
+        
+        return self
+    
+    
+    def lookup(self, sliders):
+        
+        # multilinear interpolation between the 2^d grid corners
+        lower = []
+        weights = []
+        
+        for i, slider in enumerate(self.slider_names):
+            
+            axis = self.axes[i]
+            value = min(max(float(sliders[slider]), axis[0]), axis[-1])
+            
+            idx = int(np.searchsorted(axis, value, side="right")) - 1
+            idx = min(max(idx, 0), len(axis) - 2)
+            
+            t = (value - axis[idx]) / (axis[idx + 1] - axis[idx])
+            
+            lower.append(idx)
+            weights.append(t)
+        
+        prob = 0.0
+        for corner in itertools.product((0, 1), repeat=len(lower)):
+            
+            w = 1.0
+            point = []
+            for i in range(len(corner)):
+                if corner[i] == 1:
+                    w = w * weights[i]
+                else:
+                    w = w * (1 - weights[i])
+                point.append(lower[i] + corner[i])
+            
+            if w > 0:
+                prob = prob + w * float(self.values[tuple(point)])
+        
+        return prob
+    
+    
+    def check_parity(self, credit_model, num_points=None, mode="strict"):
+        
+        if num_points is None:
+            num_points = config.SURFACE_PARITY_POINTS
+        
+        # random points between grid nodes, scored exactly by the model
+        rng = np.random.RandomState(config.RANDOM_STATE)
+        sliders = {}
+        for i, slider in enumerate(self.slider_names):
+            sliders[slider] = rng.uniform(self.axes[i][0], self.axes[i][-1], num_points)
+        
+        exact = credit_model.predict_proba_matrix(self.builder(sliders))
+        
+        interpolated = np.empty(num_points)
+        same_category = 0
+        for j in range(num_points):
+            point = {slider: sliders[slider][j] for slider in self.slider_names}
+            interpolated[j] = self.lookup(point)
+            
+            # category from the served value, as the api and dashboard do
+            served_cat = credit_model.get_risk_category(interpolated[j], mode)
+            if served_cat == credit_model.get_risk_category(exact[j], mode):
+                same_category = same_category + 1
+        
+        errors = np.abs(interpolated - exact)
+        max_error = float(np.max(errors))
+        agreement = same_category / num_points
+        
+        return {
+            "num_points": num_points,
+            "max_abs_error": round(max_error, 4),
+            "mean_abs_error": round(float(np.mean(errors)), 4),
+            "category_agreement_pct": round(agreement * 100, 2),
+            "passed": max_error <= config.SURFACE_PARITY_MAX_ERROR and agreement >= config.SURFACE_PARITY_MIN_AGREEMENT,
+        }
+
+
+def load_surfaces(credit_model, folder_path=None):
+    
+    # all configured surfaces, rebuilt if stale
+    surfaces = {}
+    for name in config.RESPONSE_SURFACES:
+        surface = AksumResponseSurface(name)
+        surface.load_or_build(credit_model, folder_path)
+        surfaces[name] = surface
+    
+    return surfaces
\ No newline at end of file
@@ -1,13 +1,9 @@
 # xgboost_model.py
 
-import pandas as pd
 import numpy as np
-import xgboost as xgb
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
-from sklearn.metrics import roc_auc_score
-import joblib
+import os
 import sys
+import time
 
 sys.path.append("..")
 import config
@@ -18,10 +14,15 @@ class AksumCreditModel:
     def __init__(self):
         self.model = None
         self.feature_names = config.FEATURE_NAMES
+        self.backend = config.INFERENCE_BACKEND
+        self.onnx_sessions = {}
         print("Aksum Credit Model initialized")
     
     
     def load_data(self, filepath):
+        
+        import pandas as pd
+        
         df = pd.read_csv(filepath)
         X = df[self.feature_names]
         y = df["default_flag"]
@@ -29,6 +30,9 @@ class AksumCreditModel:
     
     
     def split_data(self, X, y):
+        
+        from sklearn.model_selection import train_test_split
+        
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.2, random_state=42, stratify=y
         )
@@ -39,19 +43,118 @@ class AksumCreditModel:
         return X_train, X_test, y_train, y_test
     
     
-    def train_model(self):
-        self.model = xgb.XGBClassifier(
-            n_estimators=100,
+    def build_classifier(self, n_estimators=100):
+        
+        import xgboost as xgb
+        
+        model = xgb.XGBClassifier(
+            n_estimators=n_estimators,
             max_depth=5,
             learning_rate=0.1,
             random_state=42,
             eval_metric="logloss"
         )
+        return model
+    
+    
+    def train_model(self):
+        self.model = self.build_classifier()
         self.model.fit(self.X_train, self.y_train)
         return self.model
     
     
+    def train_full(self, X, y):
+        
+        # fresh ensemble, used when warm starts hit the tree cap
+        # every row is trained on, so there is no holdout left to save
+        self.X_test = None
+        self.y_test = None
+        self.model = self.build_classifier()
+        self.model.fit(X, y)
+        print("Model retrained on " + str(len(X)) + " rows")
+        return self.model
+    
+    
+    def get_num_trees(self):
+        return self.model.get_booster().num_boosted_rounds()
+    
+    
+    def needs_full_retrain(self, num_rounds=None):
+        
+        # every warm start adds trees, so latency grows with each run
+        if num_rounds is None:
+            num_rounds = config.INCREMENTAL_ROUNDS
+        
+        return self.get_num_trees() + num_rounds > config.INCREMENTAL_MAX_TREES
+    
+    
+    def check_labels(self, y, name):
+        
+        # one class or a handful of rows would bend the booster, or make auc undefined
+        if len(y) < config.INCREMENTAL_MIN_ROWS:
+            raise ValueError(
+                name + " has " + str(len(y)) + " rows, need at least " + str(config.INCREMENTAL_MIN_ROWS)
+            )
+        if len(np.unique(y)) < 2:
+            raise ValueError(name + " has only one class, need both defaulted and good customers")
+    
+    
+    def train_incremental(self, X_new, y_new, num_rounds=None):
+        
+        # continue boosting from the current model
+        # only the newly labelled rows are used
+        if num_rounds is None:
+            num_rounds = config.INCREMENTAL_ROUNDS
+        
+        self.check_labels(y_new, "New data")
+        
+        if self.needs_full_retrain(num_rounds):
+            raise ValueError(
+                "Incremental update would exceed " + str(config.INCREMENTAL_MAX_TREES)
+                + " trees, run a full retrain instead"
+            )
+        
+        new_model = self.build_classifier(n_estimators=num_rounds)
+        new_model.fit(X_new, y_new, xgb_model=self.model.get_booster())
+        
+        self.model = new_model
+        print("Model updated with " + str(len(X_new)) + " new rows")
+        return self.model
+    
+    
+    def check_incremental_guard(self, previous_model, X_holdout, y_holdout, max_auc_drop=None):
+        
+        from sklearn.metrics import roc_auc_score
+        
+        # compare the updated model with the one it started from on holdout,
+        # cheap enough to run every time, a full retrain only follows a failure
+        if max_auc_drop is None:
+            max_auc_drop = config.INCREMENTAL_MAX_AUC_DROP
+        
+        self.check_labels(y_holdout, "Holdout")
+        
+        inc_prob = self.model.predict_proba(X_holdout)[:, 1]
+        prev_prob = previous_model.predict_proba(X_holdout)[:, 1]
+        
+        inc_auc = roc_auc_score(y_holdout, inc_prob)
+        prev_auc = roc_auc_score(y_holdout, prev_prob)
+        auc_drop = prev_auc - inc_auc
+        
+        result = {
+            "incremental_auc": round(inc_auc, 4),
+            "previous_auc": round(prev_auc, 4),
+            "auc_drop": round(auc_drop, 4),
+            "passed": bool(auc_drop <= max_auc_drop),
+        }
+        
+        return result
+    
+    
     def evaluate_model(self):
+        
+        from sklearn.metrics import accuracy_score
+        from sklearn.metrics import roc_auc_score
+        
         y_pred = self.model.predict(self.X_test)
         y_prob = self.model.predict_proba(self.X_test)[:, 1]
         acc = accuracy_score(self.y_test, y_pred)
@@ -60,16 +163,157 @@ class AksumCreditModel:
     
     
     def save_model(self, filepath):
+        
+        import joblib
+        
+        config.ensure_dirs()
         joblib.dump(self.model, filepath)
         print("Model saved")
+        
+        # small sample so explainers never need the training csv
+        if getattr(self, "X_train", None) is not None:
+            self.save_background_sample(filepath, self.X_train)
+        
+        # rows the model never saw, for offline reports
+        self.save_holdout(filepath)
+        
+        # retrains must not leave onnx files from the previous booster behind
+        if self.backend == "onnx":
+            self.export_onnx(filepath)
+    
+    
+    def get_background_path(self, filepath):
+        base = os.path.splitext(str(filepath))[0]
+        return base + "_background.npy"
+    
+    
+    def get_holdout_path(self, filepath):
+        base = os.path.splitext(str(filepath))[0]
+        return base + "_holdout.npz"
+    
+    
+    def save_holdout(self, filepath):
+        
+        path = self.get_holdout_path(filepath)
+        
+        # warm starts keep the saved holdout, their new rows are not in it
+        if not hasattr(self, "X_test"):
+            return
+        
+        # a holdout from an older model may overlap this one's training rows
+        if self.X_test is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        
+        X = np.asarray(self.X_test[self.feature_names], dtype=np.float64)
+        np.savez(path, X=X, y=np.asarray(self.y_test))
+    
+    
+    def load_holdout(self, filepath):
+        
+        path = self.get_holdout_path(filepath)
+        if not os.path.exists(path):
+            return None, None
+        
+        data = np.load(path)
+        return data["X"], data["y"]
+    
+    
+    def get_tree_counts(self, step):
+        
+        # every step trees, always ending with the whole ensemble
+        total = self.model.get_booster().num_boosted_rounds()
+        return list(range(step, total, step)) + [total]
+    
+    
+    def save_background_sample(self, filepath, X):
+        
+        size = config.EXPLAIN_BACKGROUND_SIZE
+        if len(X) > size:
+            X = X.sample(n=size, random_state=config.RANDOM_STATE)
+        
+        sample = np.asarray(X[self.feature_names], dtype=np.float32)
+        np.save(self.get_background_path(filepath), sample)
     
     
     def load_model(self, filepath):
+        
+        import joblib
+        
         self.model = joblib.load(filepath)
         print("Model loaded")
+        
+        # booster stays loaded for explanations, onnx is used for scoring
+        if self.backend == "onnx":
+            self.load_onnx(filepath)
+    
+    
+    def get_model_version(self):
+        
+        from utils.model_version import get_model_version
+        
+        return get_model_version(self.model)
+    
+    
+    def get_onnx_path(self, filepath, tier):
+        base = os.path.splitext(str(filepath))[0]
+        return base + "_" + tier + ".onnx"
+    
+    
+    def export_onnx(self, filepath):
+        
+        from models.onnx_backend import export_credit_model
+        
+        # one onnx file per prediction tier
+        model_version = self.get_model_version()
+        for tier, num_trees in config.PREDICTION_TIERS.items():
+            export_credit_model(self.model, self.get_onnx_path(filepath, tier), num_trees, model_version)
+    
+    
+    def load_onnx(self, filepath):
+        
+        from models.onnx_backend import AksumOnnxSession
+        
+        # onnx files from an older booster would score with stale trees
+        model_version = self.get_model_version()
+        sessions = {}
+        for tier in config.PREDICTION_TIERS:
+            session = AksumOnnxSession(self.get_onnx_path(filepath, tier))
+            if session.metadata.get("model_version") != model_version:
+                raise ValueError(
+                    "ONNX credit model for tier " + tier + " does not match the loaded model, "
+                    "re-run jobs/export_onnx.py"
+                )
+            sessions[tier] = session
+        
+        self.onnx_sessions = sessions
+        
+        print("ONNX credit model loaded")
+    
+    
+    def check_onnx_parity(self, X, tolerance=None):
+        
+        # compare onnx probabilities with the xgboost ones
+        if tolerance is None:
+            tolerance = config.ONNX_PARITY_TOLERANCE
+        
+        X = np.asarray(X, dtype=float)
+        result = {}
+        
+        for tier in config.PREDICTION_TIERS:
+            native = self.model.predict_proba(X, iteration_range=self.get_iteration_range(tier))[:, 1]
+            onnx_prob = self.onnx_sessions[tier].predict_proba(X)
+            max_diff = float(np.max(np.abs(native - onnx_prob)))
+            result[tier] = {
+                "max_abs_diff": max_diff,
+                "passed": max_diff <= tolerance,
+            }
+        
+        return result
     
     
-    def predict_single(self, customer_data):
+    def build_features(self, customer_data):
         
         # build feature array in correct order
         features = []
@@ -80,22 +324,107 @@ class AksumCreditModel:
         # make 2d numpy array
         X = np.array([features])
         
-        # predict
-        prob = self.model.predict_proba(X)[0][1]
-        pred = self.model.predict(X)[0]
+        return X
+    
+    
+    def get_iteration_range(self, tier):
+        
+        # number of trees to score with for this tier
+        if tier not in config.PREDICTION_TIERS:
+            raise ValueError("Unknown prediction tier: " + str(tier))
+        
+        num_trees = config.PREDICTION_TIERS[tier]
+        
+        # 0 means use all trees
+        return (0, num_trees)
+    
+    
+    def predict_proba_matrix(self, X, tier="full"):
+        
+        # default probability for each row
+        iteration_range = self.get_iteration_range(tier)
+        
+        if self.backend == "onnx":
+            return self.onnx_sessions[tier].predict_proba(X)
+        
+        return self.model.predict_proba(X, iteration_range=iteration_range)[:, 1]
+    
+    
+    def predict_with_contributions(self, X, tier="full", approximate=False):
+        
+        import xgboost as xgb
+        
+        # exact tree shap values from the booster, last column is the bias
+        # approximate uses saabas path attribution, much cheaper on deep trees
+        dmatrix = xgb.DMatrix(np.asarray(X, dtype=float), feature_names=list(self.feature_names))
+        contribs = self.model.get_booster().predict(
+            dmatrix,
+            pred_contribs=True,
+            approx_contribs=approximate,
+            iteration_range=self.get_iteration_range(tier)
+        )
+        
+        # contributions add up to the margin, so probability comes for free
+        margin = contribs.sum(axis=1)
+        prob = 1 / (1 + np.exp(-margin))
         
-        # get category
-        cat = self.get_risk_category(prob, "strict")
+        return prob, contribs[:, :-1], float(contribs[0, -1])
+    
+    
+    def build_result(self, prob):
         
         result = {
             "default_probability": round(float(prob), 4),
-            "default_prediction": int(pred),
-            "risk_category": cat
+            "default_prediction": int(prob > 0.5),
+            "risk_category": self.get_risk_category(prob, "strict")
         }
         
         return result
     
     
+    def predict_single(self, customer_data, tier="full"):
+        
+        X = self.build_features(customer_data)
+        
+        # predict with the trees of this tier
+        prob = self.predict_proba_matrix(X, tier)[0]
+        
+        return self.build_result(prob)
+    
+    
+    def tier_report(self, X, y, tree_counts=None, repeats=200):
+        
+        from sklearn.metrics import roc_auc_score
+        
+        # auc and single row latency for different tree counts
+        if tree_counts is None:
+            tree_counts = self.get_tree_counts(10)
+        
+        X = np.asarray(X, dtype=float)
+        one_row = X[:1]
+        
+        report = []
+        
+        for k in tree_counts:
+            
+            prob = self.model.predict_proba(X, iteration_range=(0, k))[:, 1]
+            auc = roc_auc_score(y, prob)
+            
+            # time single customer scoring like the api does
+            start = time.perf_counter()
+            for i in range(repeats):
+                self.model.predict_proba(one_row, iteration_range=(0, k))
+            latency_ms = (time.perf_counter() - start) / repeats * 1000
+            
+            report.append({
+                "num_trees": k,
+                "auc_roc": round(auc, 4),
+                "latency_ms": round(latency_ms, 4),
+            })
+        
+        return report
+    
+    
     def get_risk_category(self, prob, mode):
         
         if mode == "strict":
@@ -114,7 +443,7 @@ class AksumCreditModel:
                 return "MEDIUM"
             elif prob < 0.8:
                 return "HIGH"
-        
+            
             else:
                 return "VERY_HIGH"
     
@@ -0,0 +1,25 @@
+# model_version.py
+# short fingerprint of a trained xgboost model
+
+import numpy as np
+import hashlib
+
+
+def get_model_version(xgb_model):
+    
+    # hash of the serialized booster, changes whenever trees change
+    booster = xgb_model.get_booster()
+    raw = bytes(booster.save_raw())
+    
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+
+def get_arrays_version(arrays):
+    
+    # same fingerprint for flat model arrays, e.g. the fraud forest
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    
+    return digest.hexdigest()[:12]
\ No newline at end of file
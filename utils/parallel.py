@@ -0,0 +1,15 @@
+# parallel.py
+# worker counts for the process pools used by jobs
+
+import os
+
+
+def get_num_jobs(n_jobs):
+    
+    # -1 means every core this process may use
+    if n_jobs is None or n_jobs < 1:
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+    
+    return n_jobs
\ No newline at end of file
@@ -0,0 +1,17 @@
+# portfolio_reader.py
+# read large customer files a chunk at a time
+
+
+def iter_portfolio_chunks(input_path, chunk_size):
+    
+    import pandas as pd
+    
+    # read csv or parquet a fixed number of rows at a time
+    if str(input_path).endswith(".parquet"):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(str(input_path))
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        for chunk in pd.read_csv(input_path, chunksize=chunk_size):
+            yield chunk
\ No newline at end of file
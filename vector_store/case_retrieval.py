@@ -1,9 +1,7 @@
 # case_retrieval.py
 # find similar customers using faiss
 
-import faiss
 import numpy as np
-import pandas as pd
 import os
 import sys
 import pickle
@@ -27,6 +25,8 @@ class AksumCaseRetrieval:
     
     def build_index(self, customer_df):
         
+        import faiss
+        
         print("Building vector index...")
         
         # store original data
@@ -70,6 +70,8 @@ class AksumCaseRetrieval:
     
     def find_similar(self, customer_data, num_results=5):
         
+        import pandas as pd
+        
         # convert dict to dataframe if needed
         if isinstance(customer_data, dict):
             df = pd.DataFrame([customer_data])
@@ -264,8 +266,12 @@ class AksumCaseRetrieval:
     
     def save_index(self, folder_path):
         
+        import faiss
+        
         print("Saving vector index...")
         
+        config.ensure_dirs()
+        
         # save faiss index
         index_path = os.path.join(folder_path, "faiss_index.bin")
         faiss.write_index(self.index, index_path)
@@ -280,6 +286,8 @@ class AksumCaseRetrieval:
     
     def load_index(self, folder_path):
         
+        import faiss
+        
         print("Loading vector index...")
         
         # load faiss index
@@ -0,0 +1,139 @@
+# duplicate_finder.py
+# find groups of near identical customers with a faiss self join
+
+import numpy as np
+import sys
+
+sys.path.append("..")
+import config
+
+
+class AksumDuplicateFinder:
+    
+    def __init__(self, case_retrieval, radius=None, num_neighbors=None, chunk_size=None):
+        
+        # uses the index and data of a built or loaded case retrieval
+        self.case_retrieval = case_retrieval
+        self.radius = radius
+        self.num_neighbors = num_neighbors
+        self.chunk_size = chunk_size
+        
+        if self.radius is None:
+            self.radius = config.DUPLICATE_RADIUS
+        if self.num_neighbors is None:
+            self.num_neighbors = config.DUPLICATE_NEIGHBORS
+        if self.chunk_size is None:
+            self.chunk_size = config.DUPLICATE_CHUNK_SIZE
+    
+    
+    def find_pairs(self):
+        
+        index = self.case_retrieval.index
+        num_vectors = index.ntotal
+        
+        # one extra neighbor because every vector finds itself
+        k = min(self.num_neighbors + 1, num_vectors)
+        
+        left_parts = []
+        right_parts = []
+        distance_parts = []
+        
+        for begin in range(0, num_vectors, self.chunk_size):
+            
+            size = min(self.chunk_size, num_vectors - begin)
+            
+            # vectors in the index are already normalized
+            vectors = index.reconstruct_n(begin, size)
+            distances, indices = index.search(vectors, k)
+            
+            row_ids = np.arange(begin, begin + size)[:, None]
+            row_ids = np.broadcast_to(row_ids, indices.shape)
+            
+            # squared l2 distances from IndexFlatL2
+            mask = (indices >= 0) & (indices != row_ids) & (distances <= self.radius)
+            
+            left = row_ids[mask]
+            right = indices[mask]
+            
+            # same pair can be found from both sides
+            left_parts.append(np.minimum(left, right))
+            right_parts.append(np.maximum(left, right))
+            distance_parts.append(distances[mask])
+            
+            print("Searched " + str(begin + size) + " of " + str(num_vectors) + " customers")
+        
+        left = np.concatenate(left_parts).astype(np.int64)
+        right = np.concatenate(right_parts).astype(np.int64)
+        distance = np.concatenate(distance_parts)
+        
+        pair_keys = left * num_vectors + right
+        pair_keys, first = np.unique(pair_keys, return_index=True)
+        
+        return left[first], right[first], distance[first]
+    
+    
+    def get_cluster_labels(self, left, right, num_vectors):
+        
+        # connected components by min label propagation
+        labels = np.arange(num_vectors)
+        
+        while True:
+            
+            lowest = np.minimum(labels[left], labels[right])
+            new_labels = labels.copy()
+            np.minimum.at(new_labels, left, lowest)
+            np.minimum.at(new_labels, right, lowest)
+            
+            # pointer jumping so long chains settle quickly
+            new_labels = new_labels[new_labels]
+            
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+        
+        return labels
+    
+    
+    def find_clusters(self, min_size=2):
+        
+        import pandas as pd
+        
+        num_vectors = self.case_retrieval.index.ntotal
+        left, right, distance = self.find_pairs()
+        
+        labels = self.get_cluster_labels(left, right, num_vectors)
+        
+        # keep only customers in a big enough group
+        counts = np.bincount(labels, minlength=num_vectors)
+        sizes = counts[labels]
+        members = np.nonzero(sizes >= min_size)[0]
+        
+        # number clusters by size, largest first
+        order = np.lexsort((labels[members], -sizes[members]))
+        members = members[order]
+        
+        # members of a cluster are next to each other after sorting
+        member_labels = labels[members]
+        starts = np.ones(len(members), dtype=bool)
+        starts[1:] = member_labels[1:] != member_labels[:-1]
+        cluster_ids = np.cumsum(starts) - 1
+        num_clusters = int(np.sum(starts))
+        
+        customer_data = self.case_retrieval.customer_data
+        
+        clusters = pd.DataFrame({
+            "cluster_id": cluster_ids,
+            "cluster_size": sizes[members],
+            "customer_id": customer_data["customer_id"].values[members],
+            "default_flag": customer_data["default_flag"].values[members],
+        })
+        
+        pairs = pd.DataFrame({
+            "customer_id_a": customer_data["customer_id"].values[left],
+            "customer_id_b": customer_data["customer_id"].values[right],
+            "distance": np.round(distance, 6),
+        })
+        
+        print("Found " + str(num_clusters) + " clusters covering " + str(len(members)) + " customers")
+        
+        return clusters, pairs
\ No newline at end of file